@@ -0,0 +1,30 @@
+"""Drop redundant indexes on primary key columns
+
+Revision ID: drop_redundant_pk_indexes
+Revises: server_side_timestamps
+Create Date: 2026-10-15 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'drop_redundant_pk_indexes'
+down_revision: Union[str, None] = 'server_side_timestamps'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('brands', 'orders', 'order_items', 'otps', 'payments', 'products', 'stores', 'users')
+
+
+def upgrade() -> None:
+    # The primary key constraint already provides a unique index on id
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_id', table_name=table)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.create_index(f'ix_{table}_id', table, ['id'], unique=False)
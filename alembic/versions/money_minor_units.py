@@ -0,0 +1,60 @@
+"""Store money amounts as integer minor units
+
+Revision ID: money_minor_units
+Revises: users_email_lowercase
+Create Date: 2026-10-15 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'money_minor_units'
+down_revision: Union[str, None] = 'users_email_lowercase'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONEY_COLUMNS = {
+    'products': ('price',),
+    'orders': ('subtotal', 'total'),
+    'order_items': ('unit_price', 'total'),
+    'payments': ('amount',),
+}
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    for table, columns in MONEY_COLUMNS.items():
+        # Scale while the column is still Numeric; converting to BIGINT first
+        # would drop the cents before they are multiplied in
+        if not _is_postgres():
+            op.execute(f"UPDATE {table} SET " + ", ".join(f"{c} = ROUND({c} * 100)" for c in columns))
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    type_=sa.BigInteger(),
+                    existing_type=sa.Numeric(12, 2),
+                    postgresql_using=f'ROUND({column} * 100)::bigint',
+                )
+
+
+def downgrade() -> None:
+    for table, columns in MONEY_COLUMNS.items():
+        # Back to Numeric before dividing, so the cents have somewhere to go
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    type_=sa.Numeric(12, 2),
+                    existing_type=sa.BigInteger(),
+                    postgresql_using=f'{column} / 100.0',
+                )
+        if not _is_postgres():
+            op.execute(f"UPDATE {table} SET " + ", ".join(f"{c} = {c} / 100.0" for c in columns))
@@ -0,0 +1,41 @@
+"""Store payments.raw_response as JSONB on PostgreSQL
+
+Revision ID: payments_raw_response_jsonb
+Revises: products_slug_unique_per_store
+Create Date: 2026-10-15 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'payments_raw_response_jsonb'
+down_revision: Union[str, None] = 'products_slug_unique_per_store'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column(
+        'payments', 'raw_response',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        postgresql_using='raw_response::jsonb',
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column(
+        'payments', 'raw_response',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        postgresql_using='raw_response::json',
+    )
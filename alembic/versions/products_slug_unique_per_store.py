@@ -0,0 +1,29 @@
+"""Make product slugs unique per store instead of globally
+
+Revision ID: products_slug_unique_per_store
+Revises: drop_redundant_pk_indexes
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'products_slug_unique_per_store'
+down_revision: Union[str, None] = 'drop_redundant_pk_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_products_slug', table_name='products')
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.create_unique_constraint('uq_products_store_id_slug', ['store_id', 'slug'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_constraint('uq_products_store_id_slug', type_='unique')
+    op.create_index('ix_products_slug', 'products', ['slug'], unique=True)
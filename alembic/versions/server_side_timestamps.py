@@ -0,0 +1,39 @@
+"""Generate created_at/updated_at on the database side
+
+Revision ID: server_side_timestamps
+Revises: stores_lower_domain_indexes
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from core.db import utcnow
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'server_side_timestamps'
+down_revision: Union[str, None] = 'stores_lower_domain_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMPED_TABLES = ('users', 'stores', 'brands', 'products', 'orders', 'payments')
+
+
+def upgrade() -> None:
+    for table in TIMESTAMPED_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', server_default=utcnow())
+            batch_op.alter_column('updated_at', server_default=utcnow())
+    with op.batch_alter_table('user_store_roles') as batch_op:
+        batch_op.alter_column('created_at', server_default=utcnow())
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('user_store_roles') as batch_op:
+        batch_op.alter_column('created_at', server_default=None)
+    for table in TIMESTAMPED_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('updated_at', server_default=None)
+            batch_op.alter_column('created_at', server_default=None)
@@ -0,0 +1,48 @@
+"""Index stores by lower(domain) / lower(subdomain)
+
+Revision ID: stores_lower_domain_indexes
+Revises: add_user_profile_fields
+Create Date: 2026-10-15 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'stores_lower_domain_indexes'
+down_revision: Union[str, None] = 'add_user_profile_fields'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stores whose domain or subdomain differ only by case would fail the new
+    # unique indexes partway through; they need renaming before this can run
+    bind = op.get_bind()
+    clashes = []
+    for column in ('domain', 'subdomain'):
+        duplicates = bind.execute(sa.text(
+            f"SELECT lower({column}) FROM stores WHERE {column} IS NOT NULL "
+            f"GROUP BY lower({column}) HAVING count(*) > 1 ORDER BY 1"
+        )).scalars().all()
+        clashes += [f"{column} {value}" for value in duplicates]
+    if clashes:
+        raise RuntimeError(
+            "Cannot add case-insensitive unique store indexes; these values are used by more "
+            "than one store and must be renamed first: " + ", ".join(clashes)
+        )
+
+    op.drop_index('ix_stores_domain', table_name='stores')
+    op.drop_index('ix_stores_subdomain', table_name='stores')
+    op.create_index('ix_stores_domain_lower', 'stores', [sa.text('lower(domain)')], unique=True)
+    op.create_index('ix_stores_subdomain_lower', 'stores', [sa.text('lower(subdomain)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stores_subdomain_lower', table_name='stores')
+    op.drop_index('ix_stores_domain_lower', table_name='stores')
+    op.create_index('ix_stores_subdomain', 'stores', ['subdomain'], unique=True)
+    op.create_index('ix_stores_domain', 'stores', ['domain'], unique=True)
@@ -0,0 +1,32 @@
+"""Compound (store_id, id) indexes for tenant-scoped tables
+
+Revision ID: tenant_compound_indexes
+Revises: money_minor_units
+Create Date: 2026-10-15 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'tenant_compound_indexes'
+down_revision: Union[str, None] = 'money_minor_units'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ('brands', 'orders'):
+        op.create_index(f'ix_{table}_store_id_id', table, ['store_id', 'id'])
+        op.drop_index(f'ix_{table}_store_id', table_name=table)
+    # uq_products_store_id_slug leads with store_id and covers it
+    op.drop_index('ix_products_store_id', table_name='products')
+
+
+def downgrade() -> None:
+    op.create_index('ix_products_store_id', 'products', ['store_id'])
+    for table in ('brands', 'orders'):
+        op.create_index(f'ix_{table}_store_id', table, ['store_id'])
+        op.drop_index(f'ix_{table}_store_id_id', table_name=table)
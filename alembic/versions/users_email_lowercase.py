@@ -0,0 +1,40 @@
+"""Store user emails lower-cased
+
+Revision ID: users_email_lowercase
+Revises: payments_raw_response_jsonb
+Create Date: 2026-10-15 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'users_email_lowercase'
+down_revision: Union[str, None] = 'payments_raw_response_jsonb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Accounts differing only by case (e.g. older OAuth sign-ups) would collide
+    # on the unique index; they need a manual merge before this can run
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT lower(email) FROM users GROUP BY lower(email) HAVING count(*) > 1 ORDER BY 1"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "Cannot lower-case user emails; these addresses belong to more than one account "
+            "and must be merged first: " + ", ".join(duplicates)
+        )
+
+    # Lookups compare against lower-cased input, so the plain unique index on
+    # email serves them once stored values are normalized too
+    op.execute("UPDATE users SET email = lower(email) WHERE email <> lower(email)")
+
+
+def downgrade() -> None:
+    # Original casing is not recoverable; lower-cased emails remain valid
+    pass
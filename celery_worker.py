@@ -10,15 +10,26 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# The gevent pool needs the stdlib patched before anything opens sockets
+if os.getenv("CELERY_POOL", "gevent") == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
 if __name__ == "__main__":
     from core.celery import celery_app
+    from core.config import settings
     
-    # Start Celery worker
-    celery_app.start([
+    argv = [
         "worker",
         "--loglevel=info",
-        "--concurrency=4",
+        f"--pool={settings.CELERY_POOL}",
+        f"--concurrency={settings.CELERY_CONCURRENCY}",
         "--without-gossip",
         "--without-mingle",
         "--without-heartbeat",
-    ])
+    ]
+    # -Ofair hands tasks only to idle prefork children so a slow SMTP send
+    # doesn't hold up tasks queued behind it; other pools ignore it
+    if settings.CELERY_POOL == "prefork":
+        argv.append("-Ofair")
+    celery_app.start(argv)
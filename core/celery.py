@@ -1,10 +1,21 @@
+import orjson
 from celery import Celery
+from kombu.serialization import register
 from core.config import settings
 
 # Use Redis for production/development
 broker_url = settings.REDIS_URL
 backend_url = settings.REDIS_URL
 
+# orjson for task and result envelopes; plain json is still accepted from older producers
+register(
+    "orjson",
+    orjson.dumps,
+    orjson.loads,
+    content_type="application/x-orjson",
+    content_encoding="utf-8",
+)
+
 # Create Celery app
 celery_app = Celery(
     "multitenant_ecommerce",
@@ -15,17 +26,18 @@ celery_app = Celery(
 
 # Configure Celery
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer="orjson",
+    accept_content=["orjson", "json"],
+    result_serializer="orjson",
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
-    worker_prefetch_multiplier=1,
+    worker_prefetch_multiplier=settings.CELERY_PREFETCH_MULTIPLIER,
     worker_max_tasks_per_child=1000,
     # Don't use eager mode - use actual Redis
     task_always_eager=False,
     task_eager_propagates=False,
 )
+
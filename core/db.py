@@ -1,9 +1,11 @@
 from contextlib import contextmanager
 from typing import Generator
 
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, DateTime
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.expression import FunctionElement
 
 from core.config import settings
 
@@ -12,6 +14,59 @@ class Base(DeclarativeBase):
     pass
 
 
+class StoreScoped:
+    """Mixin for models owned by a store (rows carry a ``store_id``)."""
+
+    @classmethod
+    def get_for_store(cls, db, store_id: int, pk: int):
+        # PK get checks the identity map first; the store check keeps tenants apart
+        obj = db.get(cls, pk)
+        return obj if obj is not None and obj.store_id == store_id else None
+
+
+class utcnow(FunctionElement):
+    """Naive UTC timestamp generated by the database (server-side datetime.utcnow)."""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _pg_utcnow(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, "sqlite")
+def _sqlite_utcnow(element, compiler, **kw):
+    # CURRENT_TIMESTAMP is whole seconds on SQLite; keep millisecond precision
+    return "STRFTIME('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+class utc_month_start(FunctionElement):
+    """Start of the current UTC calendar month, computed by the database."""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_month_start)
+def _default_utc_month_start(element, compiler, **kw):
+    return "DATE_TRUNC('month', CURRENT_TIMESTAMP)"
+
+
+@compiles(utc_month_start, "postgresql")
+def _pg_utc_month_start(element, compiler, **kw):
+    return "DATE_TRUNC('month', TIMEZONE('utc', CURRENT_TIMESTAMP))"
+
+
+@compiles(utc_month_start, "sqlite")
+def _sqlite_utc_month_start(element, compiler, **kw):
+    return "STRFTIME('%Y-%m-01 00:00:00.000', 'now')"
+
+
 # Configure engine based on database type
 if settings.DATABASE_URL.startswith("sqlite"):
     # For SQLite, use StaticPool for in-memory databases and enable foreign keys
@@ -23,11 +78,18 @@ if settings.DATABASE_URL.startswith("sqlite"):
         poolclass=StaticPool if ":memory:" in settings.DATABASE_URL else None,
     )
     
-    # Enable foreign key constraints for SQLite
+    # Enable foreign key constraints and file-DB tuning for SQLite
     @event.listens_for(engine, "connect")
     def set_sqlite_pragma(dbapi_conn, connection_record):
         cursor = dbapi_conn.cursor()
         cursor.execute("PRAGMA foreign_keys=ON")
+        if ":memory:" not in settings.DATABASE_URL:
+            # WAL lets readers proceed during writes; NORMAL skips the per-commit fsync
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-65536")
         cursor.close()
 else:
     # For PostgreSQL and other databases
@@ -35,6 +97,10 @@ else:
         settings.DATABASE_URL,
         echo=settings.SQLALCHEMY_ECHO,
         future=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE,
     )
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
@@ -1,13 +1,82 @@
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Optional
-from datetime import datetime
+import redis
+from cachetools import TTLCache
 from fastapi import Header, HTTPException, status, Request, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, or_, case, select, bindparam, lambda_stmt
 
-from core.db import get_db
+from core.config import settings
+from core.db import get_db, utcnow, utc_month_start
 from models.store import Store
 from models.user import User, user_store_roles
 
+@dataclass(slots=True)
+class StoreCtx:
+    """Read-only snapshot of the Store columns used by request handlers."""
+    id: int
+    name: str
+    domain: str
+    logo_url: Optional[str]
+    is_active: bool
+    is_suspended: bool
+    suspension_reason: Optional[str]
+    subscription_ok: bool
+    max_products: Optional[int]
+    max_orders_per_month: Optional[int]
+
+
+ROLE_RANK = MappingProxyType({"owner": 4, "admin": 3, "staff": 2, "member": 1})
+
+_STORE_COLUMNS = (
+    Store.id,
+    Store.name,
+    Store.domain,
+    Store.logo_url,
+    Store.is_active,
+    Store.is_suspended,
+    Store.suspension_reason,
+    case(
+        (or_(Store.subscription_ends_at.is_(None), Store.subscription_ends_at >= utcnow()), True),
+        else_=False,
+    ).label("subscription_ok"),
+    Store.max_products,
+    Store.max_orders_per_month,
+)
+
+# Exact domain match wins over a subdomain match (e.g., mystore.platform.com)
+_STORE_BY_DOMAIN = lambda_stmt(
+    lambda: select(*_STORE_COLUMNS)
+    .where(or_(func.lower(Store.domain) == bindparam("d"), func.lower(Store.subdomain) == bindparam("s")))
+    .order_by(case((func.lower(Store.domain) == bindparam("d"), 0), else_=1))
+    .limit(1)
+)
+
+# Also returns the subdomain so a mapped id can be checked against the host
+_STORE_BY_ID = lambda_stmt(
+    lambda: select(*_STORE_COLUMNS, Store.subdomain).where(Store.id == bindparam("id"))
+)
+
+_ROLE_IN_STORE = lambda_stmt(
+    lambda: select(user_store_roles.c.role)
+    .where(user_store_roles.c.user_id == bindparam("u"), user_store_roles.c.store_id == bindparam("s"))
+    .limit(1)
+)
+
+# Redis holds the host -> store id map. It is keyed by the full requested host
+# and only ever holds what the SQL lookup (exact domain first) resolved that
+# host to, or a store's own exact domain.
+_redis = None if settings.TESTING else redis.from_url(settings.REDIS_URL, decode_responses=True)
+STORE_DOMAIN_MAP_KEY = "stores:by_host"
+STORE_DOMAIN_MAP_TTL_SECONDS = 3600
+
+# Process-level cache of resolved stores keyed by domain (short TTL so
+# suspensions/deactivations propagate quickly).
+_store_cache: TTLCache = TTLCache(maxsize=2048, ttl=30)
+_store_cache_lock = threading.Lock()
+
 
 def resolve_domain(request: Request, x_store_domain: Optional[str] = Header(default=None, alias="X-Store-Domain")) -> str:
     """Resolve store domain from X-Store-Domain header or Host header."""
@@ -19,17 +88,121 @@ def resolve_domain(request: Request, x_store_domain: Optional[str] = Header(defa
     return host.split(":")[0].lower()
 
 
-def get_current_store(request: Request, x_store_domain: Optional[str] = Header(default=None, alias="X-Store-Domain"), db: Session = Depends(get_db)) -> Store:
+def _mapped_store_id(domain: str) -> Optional[str]:
+    """Look the requested host up in the shared Redis map."""
+    if _redis is None:
+        return None
+    try:
+        return _redis.hget(STORE_DOMAIN_MAP_KEY, domain)
+    except redis.RedisError:
+        return None
+
+
+def _map_hosts(mapping: dict) -> None:
+    """Write host -> store id entries; the hash expires as a whole."""
+    if _redis is None or not mapping:
+        return
+    try:
+        pipe = _redis.pipeline(transaction=False)
+        pipe.hset(STORE_DOMAIN_MAP_KEY, mapping=mapping)
+        pipe.expire(STORE_DOMAIN_MAP_KEY, STORE_DOMAIN_MAP_TTL_SECONDS, nx=True)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def _unmap_hosts(*domains: str) -> None:
+    if _redis is None:
+        return
+    try:
+        _redis.hdel(STORE_DOMAIN_MAP_KEY, *domains)
+    except redis.RedisError:
+        pass
+
+
+def _lookup_store(domain: str, db: Session) -> Optional[StoreCtx]:
+    """Resolve a store by exact domain or subdomain.
+
+    Checks the process cache, then the Redis host map (primary-key fetch),
+    and finally falls back to the domain/subdomain query.
+    """
+    # TTLCache expires entries on read, so lookups need the lock as well
+    with _store_cache_lock:
+        cached = _store_cache.get(domain)
+    if cached is not None:
+        return cached
+
+    subdomain = domain.split(".")[0] if "." in domain else None
+    row = None
+    store_id = _mapped_store_id(domain)
+    if store_id is not None:
+        mapped = db.execute(_STORE_BY_ID, {"id": int(store_id)}).first()
+        # A renamed store leaves its old host behind until the map expires
+        if mapped is not None and (
+            mapped.domain.lower() == domain or (mapped.subdomain or "").lower() == subdomain
+        ):
+            row = mapped[:-1]
+        else:
+            _unmap_hosts(domain)
+    if row is None:
+        row = db.execute(_STORE_BY_DOMAIN, {"d": domain, "s": subdomain}).first()
+        if row is None:
+            return None
+        _map_hosts({domain: row.id})
+    store = StoreCtx(*row)
+    with _store_cache_lock:
+        _store_cache[domain] = store
+    return store
+
+
+def warm_store_domain_map(db: Session) -> None:
+    """Rebuild the Redis host map from every active store's domain (run at startup).
+
+    Subdomain hosts are left to the SQL lookup, which also has to rule out a
+    store owning that host as its exact domain; they are mapped once resolved.
+    """
+    if _redis is None:
+        return
+    rows = db.execute(select(Store.id, Store.domain).where(Store.is_active.is_(True))).all()
+    mapping = {domain.lower(): store_id for store_id, domain in rows}
+    try:
+        _redis.delete(STORE_DOMAIN_MAP_KEY)
+    except redis.RedisError:
+        return
+    _map_hosts(mapping)
+
+
+def map_store_domain(domain: str, store_id: int) -> None:
+    """Point a store's own domain at it, replacing any subdomain match cached for that host."""
+    with _store_cache_lock:
+        _store_cache.pop(domain, None)
+    _map_hosts({domain: store_id})
+
+
+def invalidate_store_cache(*domains: str) -> None:
+    """Drop cached store lookups; clears everything when no domain is given."""
+    with _store_cache_lock:
+        if not domains:
+            _store_cache.clear()
+        for domain in domains:
+            _store_cache.pop(domain, None)
+    if domains:
+        _unmap_hosts(*domains)
+    elif _redis is not None:
+        try:
+            _redis.delete(STORE_DOMAIN_MAP_KEY)
+        except redis.RedisError:
+            pass
+
+
+def get_current_store(request: Request, x_store_domain: Optional[str] = Header(default=None, alias="X-Store-Domain"), db: Session = Depends(get_db)) -> StoreCtx:
     """FastAPI dependency that returns the Store matching the current domain."""
+    store = getattr(request.state, "store", None)
+    if store is not None:
+        return store
+
     domain = resolve_domain(request, x_store_domain)
-    
-    # Try exact domain match first
-    store = db.query(Store).filter(Store.domain == domain).one_or_none()
-    
-    # If not found, try subdomain match (e.g., mystore.platform.com)
-    if not store and "." in domain:
-        subdomain = domain.split(".")[0]
-        store = db.query(Store).filter(Store.subdomain == subdomain).one_or_none()
+    store = _lookup_store(domain, db)
     
     if not store:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Store not found")
@@ -46,25 +219,22 @@ def get_current_store(request: Request, x_store_domain: Optional[str] = Header(d
         )
     
     # Check subscription status
-    if store.subscription_ends_at and store.subscription_ends_at < datetime.utcnow():
+    if not store.subscription_ok:
         raise HTTPException(
             status_code=status.HTTP_402_PAYMENT_REQUIRED,
             detail="Store subscription has expired"
         )
     
+    request.state.store = store
     return store
 
 
 def get_user_role_in_store(user_id: int, store_id: int, db: Session) -> Optional[str]:
     """Get user's role in a specific store."""
-    result = db.query(user_store_roles.c.role).filter(
-        user_store_roles.c.user_id == user_id,
-        user_store_roles.c.store_id == store_id
-    ).first()
-    return result[0] if result else None
+    return db.execute(_ROLE_IN_STORE, {"u": user_id, "s": store_id}).scalar()
 
 
-def check_store_access(user: User, store: Store, db: Session, required_role: Optional[str] = None) -> bool:
+def check_store_access(user: User, store: StoreCtx, db: Session, required_role: Optional[str] = None) -> bool:
     """Check if user has access to store with optional role requirement."""
     if user.is_superadmin:
         return True
@@ -74,10 +244,7 @@ def check_store_access(user: User, store: Store, db: Session, required_role: Opt
         return False
     
     if required_role:
-        role_hierarchy = {"owner": 4, "admin": 3, "staff": 2, "member": 1}
-        user_level = role_hierarchy.get(role, 0)
-        required_level = role_hierarchy.get(required_role, 0)
-        return user_level >= required_level
+        return ROLE_RANK.get(role, 0) >= ROLE_RANK.get(required_role, 0)
     
     return True
 
@@ -85,7 +252,7 @@ def check_store_access(user: User, store: Store, db: Session, required_role: Opt
 def require_store_role(required_role: str = "member"):
     """Dependency to require specific role in current store."""
     def _check_role(
-        store: Store = Depends(get_current_store),
+        store: StoreCtx = Depends(get_current_store),
         user: User = Depends(get_current_user),  # You'll need to implement this
         db: Session = Depends(get_db)
     ):
@@ -103,23 +270,25 @@ def get_store_usage_stats(store_id: int, db: Session) -> dict:
     from models.product import Product
     from models.order import Order
     
-    product_count = db.query(func.count(Product.id)).filter(Product.store_id == store_id).scalar()
-    
-    # Orders this month
-    now = datetime.utcnow()
-    month_start = datetime(now.year, now.month, 1)
-    orders_this_month = db.query(func.count(Order.id)).filter(
-        Order.store_id == store_id,
-        Order.created_at >= month_start
-    ).scalar()
+    # Both counts are fetched in one round-trip via scalar subqueries
+    stmt = lambda_stmt(
+        lambda: select(
+            select(func.count(Product.id)).where(Product.store_id == bindparam("sid")).scalar_subquery().label("p"),
+            select(func.count(Order.id)).where(
+                Order.store_id == bindparam("sid"),
+                Order.created_at >= utc_month_start()
+            ).scalar_subquery().label("o"),
+        )
+    )
+    row = db.execute(stmt, {"sid": store_id}).one()
     
     return {
-        "product_count": product_count,
-        "orders_this_month": orders_this_month,
+        "product_count": row.p,
+        "orders_this_month": row.o,
     }
 
 
-def check_store_limits(store: Store, db: Session, check_type: str = "products") -> bool:
+def check_store_limits(store: StoreCtx, db: Session, check_type: str = "products") -> bool:
     """Check if store has reached its limits."""
     stats = get_store_usage_stats(store.id, db)
     
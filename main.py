@@ -1,7 +1,12 @@
 import os
+from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
-from core.db import Base, engine
+from core.config import settings
+from core.db import Base, engine, db_session
+from core.tenancy import warm_store_domain_map
 from core.celery import celery_app
 from routes.auth import router as auth_router
 from routes.stores import router as stores_router
@@ -9,18 +14,34 @@ from routes.brands import router as brands_router
 from routes.products import router as products_router
 from routes.orders import router as orders_router
 from routes.payments import router as payments_router
-from routes.oauth import router as oauth_router
+from routes.oauth import router as oauth_router, warm_google_metadata
 from routes.profile import router as profile_router
 import models  # noqa: F401 ensure models imported for metadata
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync routes and dependencies (all DB access) run on anyio worker threads
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    if settings.AUTO_CREATE_TABLES:
+        Base.metadata.create_all(bind=engine)
+    with db_session() as db:
+        warm_store_domain_map(db)
+    if not settings.TESTING:
+        await warm_google_metadata()
+    yield
+
+
 app = FastAPI(
     title=os.getenv("APP_NAME", "FastAPI Microservice"),
     version=os.getenv("APP_VERSION", "1.0.0"),
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Add OpenAPI security schemes for Bearer token authentication on docs/redoc
@@ -49,9 +70,6 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
-# Ensure tables exist (for dev/test; in prod use Alembic)
-Base.metadata.create_all(bind=engine)
-
 app.include_router(auth_router)
 app.include_router(stores_router)
 app.include_router(brands_router)
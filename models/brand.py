@@ -1,17 +1,21 @@
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy import String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from core.db import Base
+from core.db import Base, StoreScoped, utcnow
 
 
-class Brand(Base):
+class Brand(StoreScoped, Base):
     __tablename__ = "brands"
+    # Fetch server-generated timestamps via RETURNING instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+    # Tenant listings and (store_id, id) lookups in one index
+    __table_args__ = (Index("ix_brands_store_id_id", "store_id", "id"),)
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    store_id: Mapped[int] = mapped_column(ForeignKey("stores.id", ondelete="CASCADE"), index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    store_id: Mapped[int] = mapped_column(ForeignKey("stores.id", ondelete="CASCADE"))
     name: Mapped[str] = mapped_column(String(150), index=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
     store = relationship("Store")
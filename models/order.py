@@ -1,23 +1,28 @@
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey, Numeric
+from sqlalchemy import String, DateTime, ForeignKey, Index, BigInteger
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from core.db import Base
+from core.db import Base, StoreScoped, utcnow
 
 
-class Order(Base):
+class Order(StoreScoped, Base):
     __tablename__ = "orders"
+    # Fetch server-generated timestamps via RETURNING instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+    # Tenant listings and (store_id, id) lookups in one index
+    __table_args__ = (Index("ix_orders_store_id_id", "store_id", "id"),)
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    store_id: Mapped[int] = mapped_column(ForeignKey("stores.id", ondelete="CASCADE"), index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    store_id: Mapped[int] = mapped_column(ForeignKey("stores.id", ondelete="CASCADE"))
     user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     email: Mapped[str] = mapped_column(String(255))
     currency: Mapped[str] = mapped_column(String(3), default="NGN")
     status: Mapped[str] = mapped_column(String(30), default="pending")
-    subtotal: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
-    total: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Amounts in minor units (kobo/cents)
+    subtotal: Mapped[int] = mapped_column(BigInteger, default=0)
+    total: Mapped[int] = mapped_column(BigInteger, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
     store = relationship("Store")
     items = relationship("OrderItem", cascade="all, delete-orphan", back_populates="order")
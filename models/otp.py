@@ -9,7 +9,7 @@ from core.db import Base
 class OTP(Base):
     __tablename__ = "otps"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
     code: Mapped[str] = mapped_column(String(6), index=True)
     expires_at: Mapped[datetime] = mapped_column(DateTime)
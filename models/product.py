@@ -1,25 +1,30 @@
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey, Integer, Numeric, Boolean, Text
+from sqlalchemy import String, DateTime, ForeignKey, Integer, BigInteger, Boolean, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from core.db import Base
+from core.db import Base, StoreScoped, utcnow
 
 
-class Product(Base):
+class Product(StoreScoped, Base):
     __tablename__ = "products"
+    # Fetch server-generated timestamps via RETURNING instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+    # Also serves store_id-only filters, so store_id needs no index of its own
+    __table_args__ = (UniqueConstraint("store_id", "slug", name="uq_products_store_id_slug"),)
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    store_id: Mapped[int] = mapped_column(ForeignKey("stores.id", ondelete="CASCADE"), index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    store_id: Mapped[int] = mapped_column(ForeignKey("stores.id", ondelete="CASCADE"))
     brand_id: Mapped[int | None] = mapped_column(ForeignKey("brands.id", ondelete="SET NULL"), nullable=True, index=True)
     name: Mapped[str] = mapped_column(String(200), index=True)
-    slug: Mapped[str] = mapped_column(String(220), unique=True, index=True)
+    slug: Mapped[str] = mapped_column(String(220))
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
-    price: Mapped[float] = mapped_column(Numeric(12, 2))
+    # Minor units (kobo/cents)
+    price: Mapped[int] = mapped_column(BigInteger)
     currency: Mapped[str] = mapped_column(String(3), default="NGN")
     stock: Mapped[int] = mapped_column(Integer, default=0)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
     store = relationship("Store")
     brand = relationship("Brand")
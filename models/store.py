@@ -1,17 +1,19 @@
 from datetime import datetime
-from sqlalchemy import String, Boolean, DateTime, Text, JSON
+from sqlalchemy import String, Boolean, DateTime, Text, JSON, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 
-from core.db import Base
+from core.db import Base, utcnow
 
 
 class Store(Base):
     __tablename__ = "stores"
+    # Fetch server-generated timestamps via RETURNING instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(150), index=True)
-    domain: Mapped[str] = mapped_column(String(255), unique=True, index=True)
-    subdomain: Mapped[str | None] = mapped_column(String(100), unique=True, nullable=True, index=True)
+    domain: Mapped[str] = mapped_column(String(255))
+    subdomain: Mapped[str | None] = mapped_column(String(100), nullable=True)
     logo_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     
     # Tenant owner/admin
@@ -38,7 +40,12 @@ class Store(Base):
     suspension_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
     
     # Timestamps
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
     trial_ends_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     subscription_ends_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+# Tenant lookups match on lower(); these also keep domains case-insensitively unique
+Index("ix_stores_domain_lower", func.lower(Store.domain), unique=True)
+Index("ix_stores_subdomain_lower", func.lower(Store.subdomain), unique=True)
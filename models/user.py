@@ -2,9 +2,9 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import String, Boolean, DateTime, ForeignKey, Table, Column, Integer, Text
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
-from core.db import Base
+from core.db import Base, utcnow
 
 
 # Association table for many-to-many relationship between users and stores
@@ -14,22 +14,24 @@ user_store_roles = Table(
     Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
     Column("store_id", Integer, ForeignKey("stores.id", ondelete="CASCADE"), primary_key=True),
     Column("role", String(50), default="member"),  # owner, admin, staff, member
-    Column("created_at", DateTime, default=datetime.utcnow),
+    Column("created_at", DateTime, server_default=utcnow()),
 )
 
 
 class User(Base):
     __tablename__ = "users"
+    # Fetch server-generated timestamps via RETURNING instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     first_name: Mapped[str] = mapped_column(String(100))
     last_name: Mapped[str] = mapped_column(String(100))
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     password_hash: Mapped[str] = mapped_column(String(255))
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False)
     is_superadmin: Mapped[bool] = mapped_column(Boolean, default=False)  # Platform admin
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Profile fields
     bio: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -39,3 +41,8 @@ class User(Base):
     
     # Relationships
     stores = relationship("Store", secondary=user_store_roles, backref="users")
+
+    @validates("email")
+    def _normalize_email(self, key: str, value: str) -> str:
+        # Stored lower-cased so the unique email index serves case-insensitive lookups
+        return value.lower()
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+import threading
+import time
+
+from cachetools import TTLCache
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Header, Request
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from core.db import get_db, Base, engine
+from core.config import settings
+from core.db import get_db
 from models.user import User
 from schemas.auth import (
     RegisterRequest,
@@ -23,53 +29,77 @@ from services.email import send_templated_email
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Successfully decoded access tokens; TTL never exceeds the token lifetime and
+# each hit still re-checks the payload's exp.
+_decoded_tokens: TTLCache = TTLCache(maxsize=4096, ttl=min(60, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60))
+_decoded_tokens_lock = threading.Lock()
+
 
-# Ensure tables for this minimal app (in lieu of migrations)
-Base.metadata.create_all(bind=engine)
+def _decode_access_cached(token: str) -> dict:
+    # TTLCache expires entries on read, so lookups need the lock as well
+    with _decoded_tokens_lock:
+        payload = _decoded_tokens.get(token)
+    if payload is not None and payload.get("exp", 0) > time.time():
+        return payload
+    payload = jwt_utils.decode_access(token)
+    with _decoded_tokens_lock:
+        _decoded_tokens[token] = payload
+    return payload
 
 
 def get_current_user(
-    db: Session = Depends(get_db), authorization: Optional[str] = Header(default=None, alias="Authorization")
+    request: Request,
+    db: Session = Depends(get_db),
+    authorization: Optional[str] = Header(default=None, alias="Authorization"),
 ) -> User:
-    """Extract and validate current user from JWT token."""
+    """Extract and validate current user from JWT token.
+
+    The user is kept on ``request.state.current_user`` so later dependencies
+    in the same request reuse it.
+    """
+    current_user = getattr(request.state, "current_user", None)
+    if current_user is not None:
+        return current_user
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     token = authorization.split(" ", 1)[1]
     try:
-        payload = jwt_utils.decode_access(token)
+        payload = _decode_access_cached(token)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
-    user = db.query(User).filter(User.id == int(user_id)).one_or_none()
+    user = db.get(User, int(user_id))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    request.state.current_user = user
     return user
 
 
 @router.post("/register", response_model=UserOut, status_code=201)
 def register(data: RegisterRequest, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == data.email.lower()).one_or_none()
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already registered")
     user = User(
         first_name=data.first_name.strip(),
         last_name=data.last_name.strip(),
-        email=data.email.lower(),
+        email=data.email,
         password_hash=hash_password(data.password),
         is_verified=False,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    # The unique index on email rejects duplicates; no pre-SELECT needed
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
     send_verification_code(db, user)
-    return user
+    return UserOut.response(user, status_code=201)
 
 
 @router.post("/login", response_model=TokenPair)
 def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email.lower()).one_or_none()
+    user = db.query(User).filter(User.email == data.email).one_or_none()
     if not user or not verify_password(data.password, user.password_hash):
         raise HTTPException(status_code=400, detail="Invalid credentials")
     if not user.is_verified:
@@ -80,21 +110,22 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/verify-otp")
-def verify_otp(data: VerifyOtpRequest, db: Session = Depends(get_db)):
+def verify_otp(data: VerifyOtpRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     # Verify using only the code via Redis mapping
     ok, email = verify_code_without_email(data.code)
     if not ok:
         raise HTTPException(status_code=400, detail="Invalid or expired code")
     # Lookup user by email obtained from Redis
-    user = db.query(User).filter(User.email == email.lower()).one_or_none()
+    user = db.query(User).filter(User.email == email).one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Mark user as verified
     user.is_verified = True
     db.commit()
-    # Send confirmation email (templated)
-    send_templated_email(
+    # Send confirmation email (templated) after the response goes out
+    background_tasks.add_task(
+        send_templated_email,
         user.email,
         "Email verified",
         "emails/verification_success.txt",
@@ -105,7 +136,7 @@ def verify_otp(data: VerifyOtpRequest, db: Session = Depends(get_db)):
 
 @router.post("/resend-otp")
 def resend_otp(data: ResendOtpRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email.lower()).one_or_none()
+    user = db.query(User).filter(User.email == data.email).one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     try:
@@ -130,15 +161,15 @@ def change_password(
 
 @router.post("/reset-password/request")
 def reset_password_request(data: ResetPasswordRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email.lower()).one_or_none()
+    user = db.query(User).filter(User.email == data.email).one_or_none()
     if user:
         send_verification_code(db, user)
     return {"detail": "If the email exists, a code has been sent"}
 
 
 @router.post("/reset-password/confirm")
-def reset_password_confirm(data: ResetPasswordConfirm, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email.lower()).one_or_none()
+def reset_password_confirm(data: ResetPasswordConfirm, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    user = db.query(User).filter(User.email == data.email).one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     ok = verify_code(db, user, data.code)
@@ -146,8 +177,9 @@ def reset_password_confirm(data: ResetPasswordConfirm, db: Session = Depends(get
         raise HTTPException(status_code=400, detail="Invalid or expired code")
     user.password_hash = hash_password(data.new_password)
     db.commit()
-    # Send password reset confirmation email
-    send_templated_email(
+    # Send password reset confirmation email after the response goes out
+    background_tasks.add_task(
+        send_templated_email,
         user.email,
         "Password reset successful",
         "emails/password_reset_success.txt",
@@ -163,7 +195,7 @@ def refresh_token(data: RefreshTokenRequest, db: Session = Depends(get_db)):
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == int(user_id)).one_or_none()
+    user = db.get(User, int(user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     access = jwt_utils.create_access_token(str(user.id))
@@ -1,3 +1,5 @@
+import logging
+
 from fastapi import APIRouter, Request, Depends, HTTPException
 from sqlalchemy.orm import Session
 from authlib.integrations.starlette_client import OAuth
@@ -5,11 +7,12 @@ from authlib.integrations.starlette_client import OAuth
 from core.config import settings
 from core.db import get_db
 from models.user import User
-from security.password import hash_password
+from security.password_pool import hash_password_async
 from security import jwt as jwt_utils
 from schemas.auth import TokenPair
 
 router = APIRouter(prefix="/auth/google", tags=["oauth"]) 
+logger = logging.getLogger(__name__)
 
 oauth = OAuth()
 oauth.register(
@@ -21,6 +24,20 @@ oauth.register(
 )
 
 
+async def warm_google_metadata() -> None:
+    """Fetch Google's discovery document and JWKS ahead of the first login.
+
+    Authlib keeps both on the client for the life of the process and refetches
+    the JWKS itself when an id_token is signed with an unknown key.
+    """
+    if not settings.GOOGLE_CLIENT_ID or not settings.GOOGLE_CLIENT_SECRET:
+        return
+    try:
+        await oauth.google.fetch_jwk_set()
+    except Exception as e:
+        logger.warning("Could not prefetch Google OAuth metadata: %s", e)
+
+
 @router.get("/login")
 async def google_login(request: Request):
     if not settings.GOOGLE_CLIENT_ID or not settings.GOOGLE_CLIENT_SECRET:
@@ -56,12 +73,11 @@ async def google_callback(request: Request, db: Session = Depends(get_db)):
             first_name=first or "Google",
             last_name=last or "User",
             email=email,
-            password_hash=hash_password(email + "|google"),
+            password_hash=await hash_password_async(email + "|google"),
             is_verified=True,
         )
         db.add(user)
         db.commit()
-        db.refresh(user)
     else:
         if not user.is_verified:
             user.is_verified = True
@@ -1,11 +1,10 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from decimal import Decimal
+from sqlalchemy import insert, select, lambda_stmt
+from sqlalchemy.orm import Session, selectinload
 
 from core.db import get_db
-from core.tenancy import get_current_store
-from models.store import Store
+from core.tenancy import StoreCtx, get_current_store
 from models.order import Order
 from models.order_item import OrderItem
 from models.product import Product
@@ -14,27 +13,23 @@ from schemas.order import OrderCreate, OrderOut
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
-def _to_decimal(value: float | int | Decimal) -> Decimal:
-    if isinstance(value, Decimal):
-        return value
-    return Decimal(str(value))
-
-
 @router.get("/", response_model=List[OrderOut])
-def list_orders(store: Store = Depends(get_current_store), db: Session = Depends(get_db)):
-    return db.query(Order).filter(Order.store_id == store.id).all()
+def list_orders(store: StoreCtx = Depends(get_current_store), db: Session = Depends(get_db)):
+    store_id = store.id
+    stmt = lambda_stmt(lambda: select(Order).options(selectinload(Order.items)).where(Order.store_id == store_id))
+    return db.execute(stmt).scalars().all()
 
 
 @router.get("/{order_id}", response_model=OrderOut)
-def get_order(order_id: int, store: Store = Depends(get_current_store), db: Session = Depends(get_db)):
-    order = db.query(Order).filter(Order.store_id == store.id, Order.id == order_id).one_or_none()
+def get_order(order_id: int, store: StoreCtx = Depends(get_current_store), db: Session = Depends(get_db)):
+    order = Order.get_for_store(db, store.id, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     return order
 
 
 @router.post("/", response_model=OrderOut, status_code=201)
-def create_order(data: OrderCreate, store: Store = Depends(get_current_store), db: Session = Depends(get_db)):
+def create_order(data: OrderCreate, store: StoreCtx = Depends(get_current_store), db: Session = Depends(get_db)):
     if not data.items:
         raise HTTPException(status_code=400, detail="Order must contain items")
 
@@ -47,30 +42,38 @@ def create_order(data: OrderCreate, store: Store = Depends(get_current_store), d
     if len(products_map) != len(set(product_ids)):
         raise HTTPException(status_code=404, detail="One or more products not found for this store")
 
-    order = Order(store_id=store.id, email=data.email, currency=data.currency, status="pending")
-    db.add(order)
-    db.flush()
-
-    subtotal = Decimal("0.00")
-    items: list[OrderItem] = []
+    # Prices are integer minor units, so totals are plain int arithmetic
+    subtotal = 0
+    items_data: list[dict] = []
     for item in data.items:
         product = products_map[item.product_id]
-        unit_price = _to_decimal(product.price)
-        total = unit_price * _to_decimal(item.quantity)
+        unit_price = product.price
+        total = unit_price * item.quantity
         subtotal += total
-        items.append(
-            OrderItem(
-                order_id=order.id,
-                product_id=product.id,
-                quantity=item.quantity,
-                unit_price=unit_price,
-                total=total,
-            )
+        items_data.append(
+            {
+                "product_id": product.id,
+                "quantity": item.quantity,
+                "unit_price": unit_price,
+                "total": total,
+            }
         )
 
-    order.subtotal = subtotal
-    order.total = subtotal  # taxes/discounts could be applied here
-    db.add_all(items)
+    # taxes/discounts could be applied to total here
+    order = Order(
+        store_id=store.id,
+        email=data.email,
+        currency=data.currency,
+        status="pending",
+        subtotal=subtotal,
+        total=subtotal,
+    )
+    db.add(order)
+    db.flush()
+
+    # One executemany for all items instead of per-object unit-of-work inserts
+    for row in items_data:
+        row["order_id"] = order.id
+    db.execute(insert(OrderItem), items_data)
     db.commit()
-    db.refresh(order)
     return order
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, lambda_stmt
 from sqlalchemy.orm import Session
 
 from core.db import get_db
-from core.tenancy import get_current_store
-from models.store import Store
+from core.tenancy import StoreCtx, get_current_store
 from models.order import Order
 from models.payment import Payment
 from schemas.payment import (
@@ -16,19 +16,31 @@ from services.paystack import initialize_transaction, verify_transaction
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
+# Provider fields worth keeping on Payment.raw_response
+_RESPONSE_DATA_FIELDS = ("reference", "status", "gateway_response", "channel", "fees")
+
+
+def _summarize_response(resp: dict) -> dict:
+    data = resp.get("data") or {}
+    return {
+        "status": resp.get("status"),
+        "message": resp.get("message"),
+        "data": {k: data.get(k) for k in _RESPONSE_DATA_FIELDS},
+    }
+
 
 @router.post("/init", response_model=PaymentInitResponse)
-def init_payment(data: PaymentInitRequest, store: Store = Depends(get_current_store), db: Session = Depends(get_db)):
-    order = db.query(Order).filter(Order.store_id == store.id, Order.id == data.order_id).one_or_none()
+def init_payment(data: PaymentInitRequest, store: StoreCtx = Depends(get_current_store), db: Session = Depends(get_db)):
+    order = Order.get_for_store(db, store.id, data.order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    if order.total is None or float(order.total) <= 0:
+    if order.total is None or order.total <= 0:
         raise HTTPException(status_code=400, detail="Order total must be greater than 0")
 
     # Initialize transaction with Paystack
     resp = initialize_transaction(
         email=order.email,
-        amount=float(order.total),
+        amount=order.total,
         callback_url=data.callback_url,
         metadata={"order_id": order.id, "store_id": store.id},
     )
@@ -48,7 +60,7 @@ def init_payment(data: PaymentInitRequest, store: Store = Depends(get_current_st
         amount=order.total,
         currency=order.currency,
         status="initialized",
-        raw_response=resp,
+        raw_response=_summarize_response(resp),
     )
     db.add(payment)
     db.commit()
@@ -60,21 +72,23 @@ def init_payment(data: PaymentInitRequest, store: Store = Depends(get_current_st
 
 
 @router.post("/verify", response_model=PaymentOut)
-def verify_payment(data: PaymentVerifyRequest, store: Store = Depends(get_current_store), db: Session = Depends(get_db)):
-    payment = db.query(Payment).filter(Payment.store_id == store.id, Payment.reference == data.reference).one_or_none()
+def verify_payment(data: PaymentVerifyRequest, store: StoreCtx = Depends(get_current_store), db: Session = Depends(get_db)):
+    store_id, reference = store.id, data.reference
+    payment = db.execute(
+        lambda_stmt(lambda: select(Payment).where(Payment.store_id == store_id, Payment.reference == reference))
+    ).scalar_one_or_none()
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
 
     resp = verify_transaction(data.reference)
-    payment.raw_response = resp
+    payment.raw_response = _summarize_response(resp)
     if resp.get("status") and resp.get("data", {}).get("status") == "success":
         payment.status = "success"
         # Mark order paid
-        order = db.query(Order).filter(Order.id == payment.order_id).first()
+        order = db.get(Order, payment.order_id)
         if order:
             order.status = "paid"
     else:
         payment.status = resp.get("data", {}).get("status") or "failed"
     db.commit()
-    db.refresh(payment)
     return payment
@@ -1,33 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete, exists, select, lambda_stmt
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
 
 from core.db import get_db
-from core.tenancy import get_current_store
-from models.store import Store
+from core.tenancy import StoreCtx, get_current_store
 from models.product import Product
 from models.brand import Brand
-from schemas.product import ProductCreate, ProductUpdate, ProductOut
+from schemas.product import ProductCreate, ProductUpdate, ProductOut, ProductListItemOut
 
 router = APIRouter(prefix="/products", tags=["products"])
 
 
-@router.get("/", response_model=List[ProductOut])
-def list_products(store: Store = Depends(get_current_store), db: Session = Depends(get_db)):
-    qs = db.query(Product).filter(Product.store_id == store.id)
-    return qs.all()
+def _brand_in_store(db: Session, brand_id: int, store_id: int) -> bool:
+    return db.query(exists().where(Brand.id == brand_id, Brand.store_id == store_id)).scalar()
+
+
+@router.get("/", response_model=List[ProductListItemOut])
+def list_products(store: StoreCtx = Depends(get_current_store), db: Session = Depends(get_db)):
+    store_id = store.id
+    # Only the listing columns; descriptions can be large and aren't shown here
+    stmt = lambda_stmt(
+        lambda: select(
+            Product.id,
+            Product.name,
+            Product.slug,
+            Product.price,
+            Product.currency,
+            Product.stock,
+            Product.brand_id,
+            Product.is_active,
+        ).where(Product.store_id == store_id)
+    )
+    return db.execute(stmt).all()
 
 
 @router.post("/", response_model=ProductOut, status_code=201)
-def create_product(data: ProductCreate, store: Store = Depends(get_current_store), db: Session = Depends(get_db)):
-    # Ensure slug not already used in this store
-    existing = db.query(Product).filter(Product.store_id == store.id, Product.slug == data.slug).one_or_none()
-    if existing:
-        raise HTTPException(status_code=400, detail="Slug already exists in this store")
-
+def create_product(data: ProductCreate, store: StoreCtx = Depends(get_current_store), db: Session = Depends(get_db)):
     if data.brand_id:
-        brand = db.query(Brand).filter(Brand.id == data.brand_id, Brand.store_id == store.id).one_or_none()
-        if not brand:
+        if not _brand_in_store(db, data.brand_id, store.id):
             raise HTTPException(status_code=404, detail="Brand not found for this store")
 
     product = Product(
@@ -42,29 +54,34 @@ def create_product(data: ProductCreate, store: Store = Depends(get_current_store
         is_active=True,
     )
     db.add(product)
-    db.commit()
-    db.refresh(product)
+    # (store_id, slug) is unique, so a reused slug fails the insert
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Slug already exists in this store")
     return product
 
 
 @router.get("/{slug}", response_model=ProductOut)
-def get_product(slug: str, store: Store = Depends(get_current_store), db: Session = Depends(get_db)):
-    product = db.query(Product).filter(Product.store_id == store.id, Product.slug == slug).one_or_none()
+def get_product(slug: str, store: StoreCtx = Depends(get_current_store), db: Session = Depends(get_db)):
+    store_id = store.id
+    stmt = lambda_stmt(lambda: select(Product).where(Product.store_id == store_id, Product.slug == slug))
+    product = db.execute(stmt).scalar_one_or_none()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
 
 @router.patch("/{product_id}", response_model=ProductOut)
-def update_product(product_id: int, data: ProductUpdate, store: Store = Depends(get_current_store), db: Session = Depends(get_db)):
-    product = db.query(Product).filter(Product.store_id == store.id, Product.id == product_id).one_or_none()
+def update_product(product_id: int, data: ProductUpdate, store: StoreCtx = Depends(get_current_store), db: Session = Depends(get_db)):
+    product = Product.get_for_store(db, store.id, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
     if data.brand_id is not None:
         if data.brand_id:
-            brand = db.query(Brand).filter(Brand.id == data.brand_id, Brand.store_id == store.id).one_or_none()
-            if not brand:
+            if not _brand_in_store(db, data.brand_id, store.id):
                 raise HTTPException(status_code=404, detail="Brand not found for this store")
         product.brand_id = data.brand_id
 
@@ -82,15 +99,14 @@ def update_product(product_id: int, data: ProductUpdate, store: Store = Depends(
         product.is_active = data.is_active
 
     db.commit()
-    db.refresh(product)
     return product
 
 
 @router.delete("/{product_id}", status_code=204)
-def delete_product(product_id: int, store: Store = Depends(get_current_store), db: Session = Depends(get_db)):
-    product = db.query(Product).filter(Product.store_id == store.id, Product.id == product_id).one_or_none()
-    if not product:
+def delete_product(product_id: int, store: StoreCtx = Depends(get_current_store), db: Session = Depends(get_db)):
+    # Single DELETE; order_items keep their RESTRICT check in the database
+    result = db.execute(delete(Product).where(Product.store_id == store.id, Product.id == product_id))
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Product not found")
-    db.delete(product)
     db.commit()
     return None
@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+import io
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, status
+from fastapi.routing import APIRoute
 from sqlalchemy.orm import Session
 from typing import Optional
 
@@ -8,7 +11,41 @@ from schemas.profile import ProfileResponse, ProfileUpdate, ProfilePictureUpload
 from routes.auth import get_current_user
 from services.cloudinary import cloudinary_service
 
-router = APIRouter(prefix="/profile", tags=["profile"])
+MAX_PICTURE_BYTES = 5 * 1024 * 1024  # 5MB
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Allowance for multipart boundaries and part headers around the file
+MAX_REQUEST_BYTES = MAX_PICTURE_BYTES + 16 * 1024
+
+
+class _BodySizeLimitRoute(APIRoute):
+    """Rejects requests whose Content-Length is over the limit before the form is parsed."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request) -> Response:
+            length = request.headers.get("content-length")
+            if length and length.isdigit() and int(length) > MAX_REQUEST_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="File size must be less than 5MB"
+                )
+            return await handler(request)
+
+        return limited_handler
+
+
+router = APIRouter(prefix="/profile", tags=["profile"], route_class=_BodySizeLimitRoute)
+
+
+def _looks_like_image(head: bytes) -> bool:
+    """Check the leading bytes for a JPEG, PNG, GIF or WebP signature."""
+    return (
+        head.startswith(b"\xff\xd8\xff")
+        or head.startswith(b"\x89PNG\r\n\x1a\n")
+        or head[:6] in (b"GIF87a", b"GIF89a")
+        or (head[:4] == b"RIFF" and head[8:12] == b"WEBP")
+    )
 
 
 @router.get("/", response_model=ProfileResponse)
@@ -17,7 +54,7 @@ async def get_profile(
     db: Session = Depends(get_db)
 ):
     """Get current user's profile"""
-    return current_user
+    return ProfileResponse.response(current_user)
 
 
 @router.put("/", response_model=ProfileResponse)
@@ -28,15 +65,14 @@ async def update_profile(
 ):
     """Update current user's profile"""
     # Update only the fields that are provided
-    update_data = profile_data.dict(exclude_unset=True)
+    update_data = profile_data.model_dump(exclude_unset=True)
     
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
     db.commit()
-    db.refresh(current_user)
     
-    return current_user
+    return ProfileResponse.response(current_user)
 
 
 @router.patch("/", response_model=ProfileResponse)
@@ -47,15 +83,14 @@ async def patch_profile(
 ):
     """Partially update current user's profile"""
     # Update only the fields that are provided
-    update_data = profile_data.dict(exclude_unset=True)
+    update_data = profile_data.model_dump(exclude_unset=True)
     
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
     db.commit()
-    db.refresh(current_user)
     
-    return current_user
+    return ProfileResponse.response(current_user)
 
 
 @router.post("/upload-picture", response_model=ProfilePictureUpload)
@@ -73,19 +108,30 @@ async def upload_profile_picture(
             detail="File must be an image"
         )
     
-    # Validate file size (max 5MB)
-    max_size = 5 * 1024 * 1024  # 5MB
-    file_data = await file.read()
-    
-    if len(file_data) > max_size:
+    # Content-Length is checked by the route class; the streaming cap covers
+    # chunked bodies and lying headers
+    buf = io.BytesIO()
+    total = 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        total += len(chunk)
+        if total > MAX_PICTURE_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File size must be less than 5MB"
+            )
+        buf.write(chunk)
+
+    # Don't trust the client-supplied content type alone
+    if not _looks_like_image(buf.getbuffer()[:12].tobytes()):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size must be less than 5MB"
+            detail="File must be an image"
         )
+    buf.seek(0)
     
     # Upload to Cloudinary
     success, url, error = cloudinary_service.upload_profile_picture(
-        file_data=file_data,
+        file_data=buf,
         filename=file.filename,
         user_id=current_user.id
     )
@@ -99,9 +145,8 @@ async def upload_profile_picture(
     # Update user's profile picture URL
     current_user.profile_picture = url
     db.commit()
-    db.refresh(current_user)
     
-    return ProfilePictureUpload(
+    return ProfilePictureUpload.build(
         success=True,
         url=url,
         message="Profile picture uploaded successfully"
@@ -133,9 +178,8 @@ async def delete_profile_picture(
     # Update user's profile picture URL
     current_user.profile_picture = None
     db.commit()
-    db.refresh(current_user)
     
-    return ProfilePictureDelete(
+    return ProfilePictureDelete.build(
         success=True,
         message="Profile picture deleted successfully"
     )
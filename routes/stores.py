@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from core.db import get_db
-from core.tenancy import get_current_store
+from core.tenancy import StoreCtx, get_current_store, map_store_domain
 from models.store import Store
 from schemas.store import StoreCreate, StoreOut
 
@@ -10,17 +11,19 @@ router = APIRouter(prefix="/stores", tags=["stores"])
 
 
 @router.get("/current", response_model=StoreOut)
-def get_store(request: Request, store: Store = Depends(get_current_store)):
-    return store
+def get_store(request: Request, store: StoreCtx = Depends(get_current_store)):
+    return StoreOut.response(store)
 
 
 @router.post("/", response_model=StoreOut, status_code=201)
 def create_store(data: StoreCreate, db: Session = Depends(get_db)):
-    existing = db.query(Store).filter(Store.domain == data.domain.lower()).one_or_none()
-    if existing:
-        raise HTTPException(status_code=400, detail="Domain already exists")
-    store = Store(name=data.name.strip(), domain=data.domain.lower(), logo_url=data.logo_url)
+    store = Store(name=data.name.strip(), domain=data.domain.lower(), logo_url=str(data.logo_url) if data.logo_url else None)
     db.add(store)
-    db.commit()
-    db.refresh(store)
-    return store
+    # ix_stores_domain_lower enforces case-insensitive uniqueness
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Domain already exists")
+    map_store_domain(store.domain, store.id)
+    return StoreOut.response(store, status_code=201)
@@ -1,15 +1,20 @@
-from pydantic import BaseModel, EmailStr, Field
+from typing import Annotated
+
+from pydantic import AfterValidator, BaseModel, EmailStr, Field
+
+# Emails are compared and stored lower-cased; normalize once at the edge
+NormalizedEmail = Annotated[EmailStr, AfterValidator(str.lower)]
 
 
 class RegisterRequest(BaseModel):
     first_name: str = Field(min_length=1, max_length=100)
     last_name: str = Field(min_length=1, max_length=100)
-    email: EmailStr
+    email: NormalizedEmail
     password: str = Field(min_length=8, max_length=128)
 
 
 class LoginRequest(BaseModel):
-    email: EmailStr
+    email: NormalizedEmail
     password: str
 
 
@@ -24,7 +29,7 @@ class VerifyOtpRequest(BaseModel):
 
 
 class ResendOtpRequest(BaseModel):
-    email: EmailStr
+    email: NormalizedEmail
 
 
 class ChangePasswordRequest(BaseModel):
@@ -33,11 +38,11 @@ class ChangePasswordRequest(BaseModel):
 
 
 class ResetPasswordRequest(BaseModel):
-    email: EmailStr
+    email: NormalizedEmail
 
 
 class ResetPasswordConfirm(BaseModel):
-    email: EmailStr
+    email: NormalizedEmail
     code: str = Field(min_length=6, max_length=6)
     new_password: str = Field(min_length=8, max_length=128)
 
@@ -0,0 +1,29 @@
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
+
+
+class TrustedOut(BaseModel):
+    """Response schema that can be rendered straight from already-typed ORM data."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @classmethod
+    def response(cls, obj, status_code: int = 200) -> ORJSONResponse:
+        """Serialize ``obj`` without validating it.
+
+        Values come from mapped columns, so per-field validation is skipped. The
+        route's response_model still documents the shape, but FastAPI's
+        dump-and-revalidate pass does not run for a returned Response.
+        """
+        model = cls.model_construct(**{name: getattr(obj, name) for name in cls.model_fields})
+        return cls._render(model, status_code)
+
+    @classmethod
+    def build(cls, status_code: int = 200, **values) -> ORJSONResponse:
+        """Validate and serialize values the route itself produced."""
+        return cls._render(cls(**values), status_code)
+
+    @staticmethod
+    def _render(model: BaseModel, status_code: int) -> ORJSONResponse:
+        # Same response class as the app default, so every endpoint shares one serializer
+        return ORJSONResponse(model.model_dump(mode="json"), status_code=status_code)
@@ -0,0 +1,20 @@
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Annotated
+
+from pydantic import AfterValidator, Field, PlainSerializer
+
+# Amounts are stored as integer minor units (kobo/cents); the API speaks major units.
+MINOR_PER_MAJOR = 100
+_CENT = Decimal("0.01")
+
+
+def to_minor_units(amount: Decimal) -> int:
+    # Decimal keeps 1.005 as written; a float would already be 1.00499...
+    return int(amount.quantize(_CENT, rounding=ROUND_HALF_UP) * MINOR_PER_MAJOR)
+
+
+# Request field: accepts 12.5, validates to 1250. Parsed as Decimal, not float,
+# and capped at 16 digits so the minor-unit value fits a BIGINT column.
+MoneyIn = Annotated[Decimal, Field(max_digits=16), AfterValidator(to_minor_units)]
+# Response field: reads 1250 from the model, serializes as 12.5
+MoneyOut = Annotated[int, PlainSerializer(lambda v: v / MINOR_PER_MAJOR, return_type=float)]
@@ -1,6 +1,8 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ConfigDict
 from typing import List, Optional
 
+from schemas.money import MoneyOut
+
 
 class OrderItemIn(BaseModel):
     product_id: int
@@ -17,11 +19,10 @@ class OrderItemOut(BaseModel):
     id: int
     product_id: int
     quantity: int
-    unit_price: float
-    total: float
+    unit_price: MoneyOut
+    total: MoneyOut
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class OrderOut(BaseModel):
@@ -29,9 +30,8 @@ class OrderOut(BaseModel):
     email: EmailStr
     currency: str
     status: str
-    subtotal: float
-    total: float
+    subtotal: MoneyOut
+    total: MoneyOut
     items: List[OrderItemOut]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 
+from schemas.money import MoneyOut
+
 
 class PaymentInitRequest(BaseModel):
     order_id: int
@@ -21,9 +23,8 @@ class PaymentOut(BaseModel):
     id: int
     provider: str
     reference: str
-    amount: float
+    amount: MoneyOut
     currency: str
     status: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,11 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 
+from schemas.money import MoneyIn, MoneyOut
+
 
 class ProductCreate(BaseModel):
     name: str
     slug: str
-    price: float
+    price: MoneyIn
     currency: str = "NGN"
     stock: int = 0
     brand_id: Optional[int] = None
@@ -14,7 +16,7 @@ class ProductCreate(BaseModel):
 
 class ProductUpdate(BaseModel):
     name: Optional[str] = None
-    price: Optional[float] = None
+    price: Optional[MoneyIn] = None
     currency: Optional[str] = None
     stock: Optional[int] = None
     brand_id: Optional[int] = None
@@ -22,16 +24,19 @@ class ProductUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
-class ProductOut(BaseModel):
+class ProductListItemOut(BaseModel):
+    """Storefront listing row; leaves out the description."""
     id: int
     name: str
     slug: str
-    price: float
+    price: MoneyOut
     currency: str
     stock: int
     brand_id: Optional[int] = None
-    description: Optional[str] = None
     is_active: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProductOut(ProductListItemOut):
+    description: Optional[str] = None
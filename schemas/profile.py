@@ -1,21 +1,17 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
+from schemas.base import TrustedOut
+
 
 class ProfileUpdate(BaseModel):
     bio: Optional[str] = Field(None, max_length=1000)
     address: Optional[str] = Field(None, max_length=500)
     age: Optional[int] = Field(None, ge=0, le=150)
-    
-    @validator('age')
-    def validate_age(cls, v):
-        if v is not None and (v < 0 or v > 150):
-            raise ValueError('Age must be between 0 and 150')
-        return v
 
 
-class ProfileResponse(BaseModel):
+class ProfileResponse(TrustedOut):
     id: int
     first_name: str
     last_name: str
@@ -27,17 +23,14 @@ class ProfileResponse(BaseModel):
     is_verified: bool
     created_at: datetime
     updated_at: datetime
-    
-    class Config:
-        from_attributes = True
 
 
-class ProfilePictureUpload(BaseModel):
+class ProfilePictureUpload(TrustedOut):
     success: bool
     url: Optional[str] = None
     message: str
 
 
-class ProfilePictureDelete(BaseModel):
+class ProfilePictureDelete(TrustedOut):
     success: bool
     message: str
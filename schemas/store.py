@@ -1,6 +1,8 @@
 from pydantic import BaseModel, AnyHttpUrl
 from typing import Optional
 
+from schemas.base import TrustedOut
+
 
 class StoreCreate(BaseModel):
     name: str
@@ -8,11 +10,8 @@ class StoreCreate(BaseModel):
     logo_url: Optional[AnyHttpUrl] = None
 
 
-class StoreOut(BaseModel):
+class StoreOut(TrustedOut):
     id: int
     name: str
     domain: str
     logo_url: Optional[str] = None
-
-    class Config:
-        from_attributes = True
@@ -1,12 +1,10 @@
-from pydantic import BaseModel, EmailStr
+from schemas.base import TrustedOut
 
 
-class UserOut(BaseModel):
+class UserOut(TrustedOut):
     id: int
     first_name: str
     last_name: str
-    email: EmailStr
+    # Validated as EmailStr on the way in; rows coming back are trusted
+    email: str
     is_verified: bool
-
-    class Config:
-        from_attributes = True
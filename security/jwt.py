@@ -1,16 +1,30 @@
-from datetime import datetime, timedelta, timezone
+import hashlib
+import logging
+import time
+from functools import lru_cache
 from typing import Any, Dict
 
 import jwt
 
 from core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# HS256 is signed/verified through hmac/hashlib; the builtin SHA-256 is still
+# correct, just slower, so only warn when it isn't the OpenSSL-backed one
+if type(hashlib.sha256()).__module__ != "_hashlib":
+    logger.warning("hashlib.sha256 is not OpenSSL-backed; JWT signing will use the slower builtin fallback")
+
+
+@lru_cache(maxsize=8)
+def _secret_bytes(secret: str) -> bytes:
+    return secret.encode()
+
 
 def _encode(payload: Dict[str, Any], secret: str, minutes: int) -> str:
-    now = datetime.now(timezone.utc)
-    exp = now + timedelta(minutes=minutes)
-    to_encode = {"iat": int(now.timestamp()), "exp": int(exp.timestamp()), **payload}
-    return jwt.encode(to_encode, secret, algorithm=settings.JWT_ALG)
+    now = int(time.time())
+    to_encode = {"iat": now, "exp": now + minutes * 60, **payload}
+    return jwt.encode(to_encode, _secret_bytes(secret), algorithm=settings.JWT_ALG)
 
 
 def create_access_token(sub: str, extra: Dict[str, Any] | None = None) -> str:
@@ -28,8 +42,8 @@ def create_refresh_token(sub: str, extra: Dict[str, Any] | None = None) -> str:
 
 
 def decode_access(token: str) -> Dict[str, Any]:
-    return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
+    return jwt.decode(token, _secret_bytes(settings.JWT_SECRET), algorithms=[settings.JWT_ALG])
 
 
 def decode_refresh(token: str) -> Dict[str, Any]:
-    return jwt.decode(token, settings.REFRESH_SECRET, algorithms=[settings.JWT_ALG])
+    return jwt.decode(token, _secret_bytes(settings.REFRESH_SECRET), algorithms=[settings.JWT_ALG])
@@ -0,0 +1,14 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from security.password import hash_password
+
+# Hashing is CPU/memory bound, so cap concurrent hashes at the core count
+_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash")
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool, hash_password, password)
+
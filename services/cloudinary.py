@@ -2,7 +2,7 @@ import os
 import cloudinary
 import cloudinary.uploader
 from cloudinary.exceptions import Error as CloudinaryError
-from typing import Optional, Tuple
+from typing import BinaryIO, Optional, Tuple
 
 
 class CloudinaryService:
@@ -15,12 +15,12 @@ class CloudinaryService:
             secure=True
         )
     
-    def upload_profile_picture(self, file_data: bytes, filename: str, user_id: int) -> Tuple[bool, Optional[str], Optional[str]]:
+    def upload_profile_picture(self, file_data: bytes | BinaryIO, filename: str, user_id: int) -> Tuple[bool, Optional[str], Optional[str]]:
         """
         Upload a profile picture to Cloudinary
         
         Args:
-            file_data: Binary data of the image file
+            file_data: Image bytes or a binary file object positioned at its start
             filename: Original filename
             user_id: ID of the user uploading the image
             
@@ -1,6 +1,11 @@
+import logging
 import os
+import queue
+import smtplib
 from core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Try to import Celery task, fallback to direct execution if not available
 try:
     from tasks.email_tasks import send_email_task
@@ -8,16 +13,23 @@ try:
 except ImportError:
     USE_CELERY = False
 
-from typing import Dict, Any
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from typing import Dict, Any, Optional
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 
 
-# Jinja2 environment for email templates
+# Jinja2 environment for email templates. Compiled templates are cached on
+# disk across restarts; outside DEBUG the source files are not re-stat'ed.
 _templates_env = Environment(
     loader=FileSystemLoader(searchpath=os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")),
     autoescape=select_autoescape(["html", "xml", "txt"]),
+    auto_reload=settings.DEBUG,
+    bytecode_cache=FileSystemBytecodeCache(),
 )
 
+# Compile the email templates up front so the first send doesn't pay for it
+for _name in _templates_env.list_templates(filter_func=lambda name: name.startswith("emails/")):
+    _templates_env.get_template(_name)
+
 def send_email(to_email: str, subject: str, body: str) -> None:
     """
     Send email using Celery if available, otherwise send directly.
@@ -51,9 +63,49 @@ def send_templated_email(to_email: str, subject: str, template_path: str, contex
     send_email(to_email, subject, body)
 
 
+# Idle SMTP sessions for the direct fallback, so consecutive sends skip the
+# TCP + STARTTLS + AUTH handshake. Each send borrows its own session, so sends
+# still run in parallel; at most SMTP_POOL_SIZE stay open between sends.
+SMTP_POOL_SIZE = 4
+_smtp_pool: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue(maxsize=SMTP_POOL_SIZE)
+
+
+def _open_smtp_session() -> smtplib.SMTP:
+    server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT)
+    server.starttls()
+    if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
+        server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+    return server
+
+
+def _borrow_smtp_session() -> tuple[smtplib.SMTP, bool]:
+    """Take an idle session from the pool, or open a new one.
+
+    The flag says whether the session was reused from the pool.
+    """
+    try:
+        return _smtp_pool.get_nowait(), True
+    except queue.Empty:
+        return _open_smtp_session(), False
+
+
+def _return_smtp_session(server: smtplib.SMTP) -> None:
+    """Park a healthy session for reuse; close it if the pool is full."""
+    try:
+        _smtp_pool.put_nowait(server)
+    except queue.Full:
+        _close_smtp_session(server)
+
+
+def _close_smtp_session(server: smtplib.SMTP) -> None:
+    try:
+        server.close()
+    except Exception:
+        pass
+
+
 def _send_email_direct(to_email: str, subject: str, body: str) -> None:
     """Direct email sending fallback"""
-    import smtplib
     from email.message import EmailMessage
     
     # Only skip email sending with placeholder credentials
@@ -71,17 +123,27 @@ def _send_email_direct(to_email: str, subject: str, body: str) -> None:
         msg["To"] = to_email
         msg.set_content(body)
 
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()
-            if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-                server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            server.send_message(msg)
+        server, reused = _borrow_smtp_session()
+        try:
+            try:
+                server.send_message(msg)
+            except (smtplib.SMTPException, OSError):
+                if not reused:
+                    raise
+                # A pooled session the server dropped or timed out can fail in
+                # many ways (421, sender refused, socket errors); retry once fresh
+                _close_smtp_session(server)
+                server = _open_smtp_session()
+                server.send_message(msg)
+        except Exception:
+            _close_smtp_session(server)
+            raise
+        _return_smtp_session(server)
         
-        print(f"✓ Email sent successfully to {to_email}")
+        logger.info("Email sent successfully to %s", to_email)
     except Exception as e:
         if settings.DEBUG:
-            print(f"Failed to send email: {e}")
-            print(f"Email content: To: {to_email}, Subject: {subject}, Body: {body}")
+            logger.error("Failed to send email: %s", e)
+            logger.error("Email content: To: %s, Subject: %s, Body: %s", to_email, subject, body)
         else:
-            # In production, you might want to log this error
-            print(f"Email sending failed: {e}")
+            logger.error("Email sending failed: %s", e)
@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
-import random
-import json
+import secrets
+import time
+import orjson
 import redis
 from sqlalchemy.orm import Session
 
@@ -9,24 +10,61 @@ from models.user import User
 from services.email import send_templated_email
 
 # Redis connection for OTP storage
+class _FakePipeline:
+    """Queues commands and runs them against the fake on execute()."""
+
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._ops.clear()
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        def queue(*args, **kwargs):
+            self._ops.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        ops, self._ops = self._ops, []
+        return [method(*args, **kwargs) for method, args, kwargs in ops]
+
+
 class _FakeRedis:
     def __init__(self):
-        self._store = {}
-        self._exp = {}
+        # key -> (value, monotonic expiry)
+        self._store: dict[str, tuple] = {}
+        self._now = time.monotonic  # swappable clock for tests
 
     def _cleanup(self, key):
-        exp = self._exp.get(key)
-        if exp is not None and datetime.utcnow().timestamp() > exp:
-            self._store.pop(key, None)
-            self._exp.pop(key, None)
+        entry = self._store.get(key)
+        if entry is not None and self._now() > entry[1]:
+            del self._store[key]
 
     def setex(self, key, ttl, value):
-        self._store[key] = value
-        self._exp[key] = datetime.utcnow().timestamp() + int(ttl)
+        self._store[key] = (value, self._now() + int(ttl))
+
+    def set(self, key, value, ex=None, nx=False):
+        self._cleanup(key)
+        if nx and key in self._store:
+            return None
+        self._store[key] = (value, self._now() + int(ex) if ex is not None else float("inf"))
+        return True
 
     def get(self, key):
         self._cleanup(key)
-        return self._store.get(key)
+        entry = self._store.get(key)
+        return entry[0] if entry is not None else None
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
 
     def exists(self, key):
         self._cleanup(key)
@@ -34,14 +72,17 @@ class _FakeRedis:
 
     def ttl(self, key):
         self._cleanup(key)
-        if key not in self._store:
+        entry = self._store.get(key)
+        if entry is None:
             return -2  # key does not exist
-        remain = int(self._exp.get(key, 0) - datetime.utcnow().timestamp())
-        return max(remain, 0)
+        return max(int(entry[1] - self._now()), 0)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._store.pop(key, None)
 
-    def delete(self, key):
-        self._store.pop(key, None)
-        self._exp.pop(key, None)
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
 
 
 redis_client = _FakeRedis() if settings.TESTING else redis.from_url(settings.REDIS_URL, decode_responses=True)
@@ -53,18 +94,33 @@ OTP_EXPIRY = settings.OTP_TTL_SECONDS
 
 
 def _generate_code() -> str:
-    return f"{random.randint(0, 999999):06d}"
+    # CSPRNG-backed and unbiased, unlike random.randint's Mersenne Twister
+    return f"{secrets.randbelow(1_000_000):06d}"
 
 
 def send_verification_code(db: Session, user: User) -> str:
-    """Generate and store OTP in Redis, send via email"""
+    """Generate and store OTP in Redis, send via email.
+
+    Nothing is written through ``db``, so callers keep a single commit per request.
+    """
     # Rate limiting using a simple Redis key with TTL (skip when interval set to 0)
     last_key = f"{OTP_LAST_SENT_PREFIX}{user.email}"
-    if settings.OTP_RESEND_INTERVAL_SECONDS > 0 and redis_client.exists(last_key):
-        ttl = redis_client.ttl(last_key)
-        if ttl is None or ttl > 0:
-            raise ValueError(f"Please wait {ttl if ttl and ttl > 0 else settings.OTP_RESEND_INTERVAL_SECONDS} seconds before requesting a new code")
+    if settings.OTP_RESEND_INTERVAL_SECONDS > 0:
+        # SET NX claims the resend slot atomically; only a refusal needs the TTL
+        if not redis_client.set(last_key, "1", ex=settings.OTP_RESEND_INTERVAL_SECONDS, nx=True):
+            # The key may expire between SET and TTL; never report "wait -2 seconds"
+            ttl = max(redis_client.ttl(last_key), 1)
+            raise ValueError(f"Please wait {ttl} seconds before requesting a new code")
+
+    try:
+        return _store_and_send_code(user)
+    except Exception:
+        # Nothing was sent, so don't hold the user to the resend interval
+        redis_client.delete(last_key)
+        raise
 
+
+def _store_and_send_code(user: User) -> str:
     code = _generate_code()
     now = datetime.utcnow().isoformat()
     
@@ -78,19 +134,12 @@ def send_verification_code(db: Session, user: User) -> str:
         "attempts": 0
     }
     
-    # Store with expiry
-    redis_client.setex(
-        otp_key, 
-        OTP_EXPIRY, 
-        json.dumps(otp_data)
-    )
-    # Also store code->email mapping to allow email-less verification
-    code_key = f"{OTP_CODE_PREFIX}{code}"
-    redis_client.setex(code_key, OTP_EXPIRY, user.email)
-
-    # Set resend limiter key only if interval > 0
-    if settings.OTP_RESEND_INTERVAL_SECONDS > 0:
-        redis_client.setex(last_key, settings.OTP_RESEND_INTERVAL_SECONDS, "1")
+    # All writes go out in one round trip
+    with redis_client.pipeline(transaction=False) as pipe:
+        pipe.setex(otp_key, OTP_EXPIRY, orjson.dumps(otp_data))
+        # Also store code->email mapping to allow email-less verification
+        pipe.setex(f"{OTP_CODE_PREFIX}{code}", OTP_EXPIRY, user.email)
+        pipe.execute()
     
     # Use templated email (plain text) - keep same body format for tests
     body_context = {"code": code, "first_name": getattr(user, "first_name", "")}
@@ -113,7 +162,7 @@ def verify_code(db: Session, user: User, code: str) -> bool:
         return False
     
     try:
-        otp_data = json.loads(otp_data_str)
+        otp_data = orjson.loads(otp_data_str)
         
         # Check if max attempts exceeded (5 attempts)
         if otp_data.get("attempts", 0) >= 5:
@@ -124,16 +173,14 @@ def verify_code(db: Session, user: User, code: str) -> bool:
         if otp_data["code"] != code:
             # Increment attempts
             otp_data["attempts"] += 1
-            redis_client.setex(otp_key, OTP_EXPIRY, json.dumps(otp_data))
+            redis_client.setex(otp_key, OTP_EXPIRY, orjson.dumps(otp_data))
             return False
         
-        # Success - delete OTP from Redis
-        redis_client.delete(otp_key)
-        # Remove reverse mapping as well
-        redis_client.delete(f"{OTP_CODE_PREFIX}{code}")
+        # Success - delete OTP and its reverse mapping in one command
+        redis_client.delete(otp_key, f"{OTP_CODE_PREFIX}{code}")
         return True
         
-    except (json.JSONDecodeError, KeyError):
+    except (orjson.JSONDecodeError, KeyError):
         # Corrupted data - delete and fail
         redis_client.delete(otp_key)
         return False
@@ -151,36 +198,50 @@ def verify_code_without_email(code: str) -> tuple[bool, str | None]:
     if not otp_data_str:
         return False, None
     try:
-        otp_data = json.loads(otp_data_str)
+        otp_data = orjson.loads(otp_data_str)
         if otp_data.get("attempts", 0) >= 5:
-            redis_client.delete(otp_key)
-            redis_client.delete(code_key)
+            redis_client.delete(otp_key, code_key)
             return False, None
         if otp_data.get("code") != code:
             otp_data["attempts"] = otp_data.get("attempts", 0) + 1
-            redis_client.setex(otp_key, OTP_EXPIRY, json.dumps(otp_data))
+            redis_client.setex(otp_key, OTP_EXPIRY, orjson.dumps(otp_data))
             return False, None
         # Success
-        redis_client.delete(otp_key)
-        redis_client.delete(code_key)
+        redis_client.delete(otp_key, code_key)
         return True, email
-    except (json.JSONDecodeError, KeyError):
-        redis_client.delete(otp_key)
-        redis_client.delete(code_key)
+    except (orjson.JSONDecodeError, KeyError):
+        redis_client.delete(otp_key, code_key)
         return False, None
 
 
 def get_otp_status(email: str) -> dict:
     """Get OTP status for debugging/monitoring"""
     otp_key = f"{OTP_PREFIX}{email}"
-    otp_data_str = redis_client.get(otp_key)
-    
+    # Value and TTL in one round trip
+    with redis_client.pipeline(transaction=False) as pipe:
+        otp_data_str, ttl = pipe.get(otp_key).ttl(otp_key).execute()
+    return _otp_status(otp_key, otp_data_str, ttl)
+
+
+def get_otp_status_many(emails: list[str]) -> list[dict]:
+    """get_otp_status for many emails: one MGET plus the TTLs, in one round trip"""
+    keys = [f"{OTP_PREFIX}{email}" for email in emails]
+    if not keys:
+        return []
+    with redis_client.pipeline(transaction=False) as pipe:
+        pipe.mget(keys)
+        for key in keys:
+            pipe.ttl(key)
+        values, *ttls = pipe.execute()
+    return [_otp_status(key, value, ttl) for key, value, ttl in zip(keys, values, ttls)]
+
+
+def _otp_status(otp_key: str, otp_data_str, ttl) -> dict:
     if not otp_data_str:
         return {"exists": False}
     
     try:
-        otp_data = json.loads(otp_data_str)
-        ttl = redis_client.ttl(otp_key)
+        otp_data = orjson.loads(otp_data_str)
         return {
             "exists": True,
             "email": otp_data["email"],
@@ -188,6 +249,6 @@ def get_otp_status(email: str) -> dict:
             "attempts": otp_data.get("attempts", 0),
             "ttl_seconds": ttl
         }
-    except (json.JSONDecodeError, KeyError):
+    except (orjson.JSONDecodeError, KeyError):
         redis_client.delete(otp_key)
         return {"exists": False}
@@ -1,5 +1,5 @@
 import uuid
-import requests
+import httpx
 from typing import Any, Dict
 
 from core.config import settings
@@ -8,18 +8,21 @@ from core.config import settings
 PAYSTACK_BASE_URL = "https://api.paystack.co"
 
 
-def _headers() -> Dict[str, str]:
-    return {
-        "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-        "Content-Type": "application/json",
-    }
+# The secret key is fixed per process, so the headers are built once
+_HEADERS: Dict[str, str] = {
+    "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
+    "Content-Type": "application/json",
+}
+
+# Pooled keep-alive client: calls after the first reuse the TLS connection
+_client = httpx.Client(base_url=PAYSTACK_BASE_URL, headers=_HEADERS, timeout=20)
 
 
-def initialize_transaction(email: str, amount: float, reference: str | None = None, callback_url: str | None = None, metadata: Dict[str, Any] | None = None) -> Dict[str, Any]:
+def initialize_transaction(email: str, amount: int, reference: str | None = None, callback_url: str | None = None, metadata: Dict[str, Any] | None = None) -> Dict[str, Any]:
     ref = reference or str(uuid.uuid4())
     payload = {
         "email": email,
-        "amount": int(round(amount * 100)),  # Paystack amount in kobo
+        "amount": amount,  # minor units (kobo), as stored on the order
         "reference": ref,
     }
     if callback_url or settings.PAYSTACK_CALLBACK_URL:
@@ -27,12 +30,12 @@ def initialize_transaction(email: str, amount: float, reference: str | None = No
     if metadata:
         payload["metadata"] = metadata
 
-    resp = requests.post(f"{PAYSTACK_BASE_URL}/transaction/initialize", json=payload, headers=_headers(), timeout=20)
+    resp = _client.post("/transaction/initialize", json=payload)
     resp.raise_for_status()
     return resp.json()
 
 
 def verify_transaction(reference: str) -> Dict[str, Any]:
-    resp = requests.get(f"{PAYSTACK_BASE_URL}/transaction/verify/{reference}", headers=_headers(), timeout=20)
+    resp = _client.get(f"/transaction/verify/{reference}")
     resp.raise_for_status()
     return resp.json()
@@ -1,14 +1,22 @@
 import os
 import types
+from functools import lru_cache
+
+# Cheap password hashes for tests; must be set before core.config is imported
+os.environ.setdefault("ARGON2_TIME_COST", "1")
+os.environ.setdefault("ARGON2_MEMORY_KIB", "8")  # argon2 minimum for one lane
+os.environ.setdefault("ARGON2_PARALLELISM", "1")
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from main import app
 from core.db import Base, get_db
 from core import config as core_config
+from core.tenancy import invalidate_store_cache
 from services import email as email_service
 from models.user import User, user_store_roles
 from models.store import Store
@@ -16,6 +24,21 @@ from security.password import hash_password
 from security import jwt as jwt_utils
 
 
+SEED_PASSWORD = "SecurePass123!"
+
+
+@lru_cache(maxsize=8)
+def cached_password_hash(password: str) -> str:
+    """Hash a fixture password once per session; only verify() ever reads it."""
+    return hash_password(password)
+
+
+@lru_cache(maxsize=64)
+def cached_access_token(user_id: str) -> str:
+    """Sign one access token per user id; it stays valid for the whole run."""
+    return jwt_utils.create_access_token(user_id)
+
+
 @pytest.fixture(scope="session", autouse=True)
 def test_settings():
     # Speed up for tests
@@ -28,63 +51,133 @@ def test_settings():
     yield
 
 
-@pytest.fixture()
-def db_session_override():
+@pytest.fixture(scope="session")
+def engine():
+    """Single in-memory database whose schema is created once per session."""
     engine = create_engine(
         "sqlite+pysqlite:///:memory:",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
-    TestingSessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+    # Let SQLAlchemy, not pysqlite, emit BEGIN so SAVEPOINTs work
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_conn, connection_record):
+        dbapi_conn.isolation_level = None
+        # Durability is irrelevant for a throwaway test database
+        for pragma in ("synchronous=OFF", "journal_mode=MEMORY", "temp_store=MEMORY"):
+            dbapi_conn.execute(f"PRAGMA {pragma}")
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
 
-    db = TestingSessionLocal()
+@pytest.fixture()
+def db(engine):
+    """Per-test session inside an outer transaction that is rolled back."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    TestingSessionLocal = sessionmaker(
+        bind=connection,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+    db_session = TestingSessionLocal()
 
     def _get_db():
         try:
-            yield db
+            yield db_session
         finally:
             pass
 
     app.dependency_overrides[get_db] = _get_db
     try:
-        yield db
+        yield db_session
     finally:
-        db.close()
+        db_session.close()
+        transaction.rollback()
+        connection.close()
         app.dependency_overrides.clear()
 
 
+@pytest.fixture()
+def db_session_override(db):
+    return db
+
+
 @pytest.fixture(autouse=True)
-def mock_email_send(monkeypatch):
+def clear_store_cache():
+    invalidate_store_cache()
+    yield
+    invalidate_store_cache()
+
+
+@pytest.fixture(scope="session")
+def _email_sink():
+    """Outbox shared by the whole session, plus the sender that fills it."""
     sent = []
 
     def _fake_send(to_email: str, subject: str, body: str) -> None:
         sent.append({"to": to_email, "subject": subject, "body": body})
 
-    monkeypatch.setattr(email_service, "send_email", _fake_send)
+    return sent, _fake_send
+
+
+@pytest.fixture(autouse=True)
+def mock_email_send(_email_sink, monkeypatch):
+    sent, fake_send = _email_sink
+    sent.clear()
+    monkeypatch.setattr(email_service, "send_email", fake_send)
     return sent
 
 
 @pytest.fixture()
-def client(db_session_override):
+def fast_hasher(monkeypatch):
+    """Swap the KDF for a reversible stand-in in tests that don't check hashing."""
+    from routes import auth as auth_routes
+
+    def _hash(password: str) -> str:
+        return f"fake${password}"
+
+    def _verify(password: str, password_hash: str) -> bool:
+        return password_hash == f"fake${password}"
+
+    monkeypatch.setattr(auth_routes, "hash_password", _hash)
+    monkeypatch.setattr(auth_routes, "verify_password", _verify)
+
+
+@pytest.fixture()
+def seeded_hasher(monkeypatch):
+    """Reuse one real hash for the seed password; verify_password stays real."""
+    from routes import auth as auth_routes
+
+    def _hash(password: str) -> str:
+        if password == SEED_PASSWORD:
+            return cached_password_hash(password)
+        return hash_password(password)
+
+    monkeypatch.setattr(auth_routes, "hash_password", _hash)
+    return SEED_PASSWORD
+
+
+@pytest.fixture(scope="session")
+def _app_client():
+    """One TestClient for the session, so app lifespan runs once."""
     with TestClient(app) as c:
         yield c
 
 
-@pytest.fixture(scope="function")
-def db():
-    """Create a fresh database for each test."""
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=None,
-    )
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    Base.metadata.create_all(bind=engine)
-    db_session = TestingSessionLocal()
-    yield db_session
-    db_session.close()
-    Base.metadata.drop_all(bind=engine)
+@pytest.fixture()
+def client(_app_client, db_session_override):
+    _app_client.cookies.clear()
+    return _app_client
 
 
 @pytest.fixture
@@ -101,7 +194,6 @@ def test_store(db_session_override):
     )
     db_session_override.add(store)
     db_session_override.commit()
-    db_session_override.refresh(store)
     return store
 
 
@@ -112,13 +204,12 @@ def test_user(db_session_override):
         first_name="Test",
         last_name="User",
         email="test@example.com",
-        password_hash=hash_password("testpass123"),
+        password_hash=cached_password_hash("testpass123"),
         is_verified=True,
         is_superadmin=False,
     )
     db_session_override.add(user)
     db_session_override.commit()
-    db_session_override.refresh(user)
     return user
 
 
@@ -139,7 +230,7 @@ def test_user_with_store(db_session_override, test_user, test_store):
 @pytest.fixture
 def auth_token(test_user):
     """Generate a valid JWT token for test user."""
-    return jwt_utils.create_access_token(str(test_user.id))
+    return cached_access_token(str(test_user.id))
 
 
 @pytest.fixture
@@ -6,12 +6,27 @@ import pytest
 from fastapi import status
 from models.user import User
 from security.password import hash_password, verify_password
+from tests.conftest import cached_password_hash
+
+
+def _seed_user(db, email, password, verified=True):
+    """Insert a user directly, skipping the register endpoint."""
+    user = User(
+        first_name="John",
+        last_name="Doe",
+        email=email.lower(),
+        password_hash=cached_password_hash(password),
+        is_verified=verified,
+    )
+    db.add(user)
+    db.commit()
+    return user
 
 
 class TestRegister:
     """Test user registration."""
     
-    def test_register_success(self, client):
+    def test_register_success(self, client, fast_hasher):
         """Test successful user registration."""
         response = client.post(
             "/auth/register",
@@ -28,50 +43,28 @@ class TestRegister:
         assert data["first_name"] == "John"
         assert data["is_verified"] is False
     
-    def test_register_duplicate_email(self, client):
+    def test_register_duplicate_email(self, client, test_user, seeded_hasher):
         """Test registration with duplicate email fails."""
-        # Register first user
-        client.post(
-            "/auth/register",
-            json={
-                "first_name": "John",
-                "last_name": "Doe",
-                "email": "john@example.com",
-                "password": "SecurePass123!",
-            }
-        )
-        # Try to register with same email
         response = client.post(
             "/auth/register",
             json={
                 "first_name": "Jane",
                 "last_name": "Doe",
-                "email": "john@example.com",
+                "email": test_user.email,
                 "password": "SecurePass123!",
             }
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert "already registered" in response.json()["detail"]
     
-    def test_register_email_case_insensitive(self, client):
+    def test_register_email_case_insensitive(self, client, test_user, seeded_hasher):
         """Test that email registration is case-insensitive."""
-        # Register first user
-        client.post(
-            "/auth/register",
-            json={
-                "first_name": "John",
-                "last_name": "Doe",
-                "email": "john@example.com",
-                "password": "SecurePass123!",
-            }
-        )
-        # Try to register with uppercase email
         response = client.post(
             "/auth/register",
             json={
                 "first_name": "Jane",
                 "last_name": "Doe",
-                "email": "JOHN@EXAMPLE.COM",
+                "email": test_user.email.upper(),
                 "password": "SecurePass123!",
             }
         )
@@ -81,20 +74,9 @@ class TestRegister:
 class TestLogin:
     """Test user login."""
     
-    def test_login_success(self, client):
+    def test_login_success(self, client, db):
         """Test successful login."""
-        # Register and verify user first
-        client.post(
-            "/auth/register",
-            json={
-                "first_name": "John",
-                "last_name": "Doe",
-                "email": "john@example.com",
-                "password": "testpass123",
-            }
-        )
-        # Manually verify (in real app, user would verify via OTP)
-        # For now, we'll skip this and test with a pre-verified user
+        _seed_user(db, "john@example.com", "testpass123", verified=False)
         
         response = client.post(
             "/auth/login",
@@ -189,3 +171,31 @@ class TestAuthHeaders:
             json={"refresh_token": "not.a.valid.jwt"}
         )
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_access_token_round_trip(self, monkeypatch):
+        """Test access tokens carry the expected claims through decode."""
+        from core.config import settings
+        from security import jwt as jwt_utils
+
+        now = int(jwt_utils.time.time())
+        monkeypatch.setattr(jwt_utils.time, "time", lambda: now)
+        token = jwt_utils.create_access_token("42")
+        assert jwt_utils.decode_access(token) == {
+            "iat": now, "exp": now + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, "sub": "42", "type": "access",
+        }
+
+    def test_cached_token_rechecks_expiry(self, client, test_user, auth_headers, monkeypatch):
+        """Test a cached token payload is not trusted past its exp."""
+        from routes import auth as auth_routes
+
+        assert client.get("/profile/", headers=auth_headers).status_code == status.HTTP_200_OK
+        token = auth_headers["Authorization"].split(" ", 1)[1]
+        assert token in auth_routes._decoded_tokens
+
+        def _expired(token):
+            raise ValueError("Signature has expired")
+
+        monkeypatch.setattr(auth_routes.time, "time", lambda: 2 ** 40)
+        monkeypatch.setattr(auth_routes.jwt_utils, "decode_access", _expired)
+        response = client.get("/profile/", headers=auth_headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,160 @@
+"""
+Tests for data-rewriting Alembic migrations, run against SQLite.
+"""
+import importlib.util
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+VERSIONS_DIR = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+
+
+def _load_migration(name: str):
+    spec = importlib.util.spec_from_file_location(name, VERSIONS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run(connection, step):
+    with Operations.context(MigrationContext.configure(connection)):
+        step()
+
+
+@pytest.fixture
+def migration_engine():
+    engine = sa.create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+class TestMoneyMinorUnits:
+    """Money columns keep their cents through upgrade and downgrade."""
+
+    @pytest.fixture
+    def migration(self):
+        return _load_migration("money_minor_units")
+
+    @pytest.fixture
+    def money_tables(self, migration, migration_engine):
+        metadata = sa.MetaData()
+        tables = {
+            name: sa.Table(
+                name, metadata,
+                sa.Column("id", sa.Integer, primary_key=True),
+                *(sa.Column(column, sa.Numeric(12, 2)) for column in columns),
+            )
+            for name, columns in migration.MONEY_COLUMNS.items()
+        }
+        metadata.create_all(migration_engine)
+        with migration_engine.begin() as connection:
+            for name, columns in migration.MONEY_COLUMNS.items():
+                connection.execute(tables[name].insert(), [
+                    {"id": 1, **{column: Decimal("12.50") for column in columns}},
+                    {"id": 2, **{column: Decimal("19.99") for column in columns}},
+                ])
+        return migration.MONEY_COLUMNS
+
+    def _values(self, connection, table, column):
+        return connection.execute(sa.text(f"SELECT {column} FROM {table} ORDER BY id")).scalars().all()
+
+    def test_upgrade_and_downgrade_keep_cents(self, migration, money_tables, migration_engine):
+        with migration_engine.begin() as connection:
+            _run(connection, migration.upgrade)
+            for table, columns in money_tables.items():
+                for column in columns:
+                    assert self._values(connection, table, column) == [1250, 1999]
+
+        with migration_engine.begin() as connection:
+            _run(connection, migration.downgrade)
+            for table, columns in money_tables.items():
+                for column in columns:
+                    assert [Decimal(str(v)) for v in self._values(connection, table, column)] == [
+                        Decimal("12.5"), Decimal("19.99"),
+                    ]
+
+
+class TestUsersEmailLowercase:
+    """Emails are normalized, unless that would merge two accounts."""
+
+    @pytest.fixture
+    def migration(self):
+        return _load_migration("users_email_lowercase")
+
+    @pytest.fixture
+    def users(self, migration_engine):
+        metadata = sa.MetaData()
+        users = sa.Table(
+            "users", metadata,
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("email", sa.String(255), unique=True),
+        )
+        metadata.create_all(migration_engine)
+        return users
+
+    def test_upgrade_lowercases_emails(self, migration, users, migration_engine):
+        with migration_engine.begin() as connection:
+            connection.execute(users.insert(), [{"email": "Ada@Example.com"}, {"email": "bob@example.com"}])
+            _run(connection, migration.upgrade)
+            emails = connection.execute(sa.select(users.c.email).order_by(users.c.id)).scalars().all()
+        assert emails == ["ada@example.com", "bob@example.com"]
+
+    def test_upgrade_refuses_case_only_duplicates(self, migration, users, migration_engine):
+        with migration_engine.begin() as connection:
+            connection.execute(users.insert(), [{"email": "Ada@Example.com"}, {"email": "ada@example.com"}])
+            with pytest.raises(RuntimeError, match="ada@example.com"):
+                _run(connection, migration.upgrade)
+            emails = connection.execute(sa.select(users.c.email).order_by(users.c.id)).scalars().all()
+        assert emails == ["Ada@Example.com", "ada@example.com"]
+
+
+class TestStoresLowerDomainIndexes:
+    """Case-insensitive store indexes are only added when no values clash."""
+
+    @pytest.fixture
+    def migration(self):
+        return _load_migration("stores_lower_domain_indexes")
+
+    @pytest.fixture
+    def stores(self, migration_engine):
+        metadata = sa.MetaData()
+        stores = sa.Table(
+            "stores", metadata,
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("domain", sa.String(255)),
+            sa.Column("subdomain", sa.String(100)),
+            sa.Index("ix_stores_domain", "domain", unique=True),
+            sa.Index("ix_stores_subdomain", "subdomain", unique=True),
+        )
+        metadata.create_all(migration_engine)
+        return stores
+
+    def _index_names(self, connection):
+        # The inspector skips expression indexes on SQLite, so read sqlite_master
+        return set(connection.execute(sa.text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'stores' AND sql IS NOT NULL"
+        )).scalars())
+
+    def test_upgrade_adds_lower_indexes(self, migration, stores, migration_engine):
+        with migration_engine.begin() as connection:
+            connection.execute(stores.insert(), [
+                {"domain": "a.example.com", "subdomain": None},
+                {"domain": "b.example.com", "subdomain": None},
+            ])
+            _run(connection, migration.upgrade)
+            assert self._index_names(connection) == {"ix_stores_domain_lower", "ix_stores_subdomain_lower"}
+
+    @pytest.mark.parametrize("rows,clash", [
+        ([{"domain": "Shop.example.com"}, {"domain": "shop.example.com"}], "domain shop.example.com"),
+        ([{"domain": "a.example.com", "subdomain": "Shop"}, {"domain": "b.example.com", "subdomain": "shop"}], "subdomain shop"),
+    ])
+    def test_upgrade_refuses_case_only_duplicates(self, migration, stores, migration_engine, rows, clash):
+        with migration_engine.begin() as connection:
+            connection.execute(stores.insert(), rows)
+            with pytest.raises(RuntimeError, match=clash):
+                _run(connection, migration.upgrade)
+            assert self._index_names(connection) == {"ix_stores_domain", "ix_stores_subdomain"}
@@ -1,22 +1,23 @@
 import pytest
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
 from models.user import User
 from models.otp import OTP
-from core.db import Base
 
 
 @pytest.fixture
-def db_session():
-    """Create a test database session"""
-    engine = create_engine("sqlite:///:memory:")
-    Base.metadata.create_all(bind=engine)
-    SessionLocal = sessionmaker(bind=engine)
-    session = SessionLocal()
+def db_session(engine):
+    """Session on the shared test schema; every commit lands in a SAVEPOINT"""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint")
     yield session
     session.close()
+    transaction.rollback()
+    connection.close()
 
 
 class TestUser:
@@ -33,7 +34,6 @@ class TestUser:
         )
         db_session.add(user)
         db_session.commit()
-        db_session.refresh(user)
         
         assert user.id is not None
         assert user.first_name == "John"
@@ -79,12 +79,15 @@ class TestUser:
         )
         db_session.add(user2)
         
-        with pytest.raises(Exception):  # Should raise IntegrityError
+        with pytest.raises(IntegrityError):
             db_session.commit()
+        db_session.rollback()
     
     def test_user_timestamps(self, db_session):
         """Test that timestamps are properly set"""
+        # Timestamps come from the database clock at millisecond precision
         before_creation = datetime.utcnow()
+        before_creation = before_creation.replace(microsecond=before_creation.microsecond // 1000 * 1000)
         user = User(
             first_name="Test",
             last_name="User",
@@ -93,7 +96,6 @@ class TestUser:
         )
         db_session.add(user)
         db_session.commit()
-        db_session.refresh(user)
         
         after_creation = datetime.utcnow()
         
@@ -111,11 +113,10 @@ class TestUser:
         db_session.add(user)
         db_session.commit()
         
-        original_updated_at = user.updated_at
-        
-        # Wait a bit to ensure timestamp difference
-        import time
-        time.sleep(0.01)
+        # Backdate instead of sleeping so the new timestamp is strictly later
+        original_updated_at = user.updated_at - timedelta(seconds=1)
+        user.updated_at = original_updated_at
+        db_session.flush()
         
         user.first_name = "Updated"
         db_session.commit()
@@ -142,18 +143,36 @@ class TestUser:
 class TestOTP:
     """Test cases for OTP model"""
     
-    def test_otp_creation(self, db_session):
+    @pytest.fixture(scope="class")
+    def otp_connection(self, engine):
+        """Class-wide transaction holding the one user every OTP test hangs off"""
+        connection = engine.connect()
+        transaction = connection.begin()
+        user_id = connection.execute(
+            insert(User).values(first_name="John", last_name="Doe", email="john@example.com", password_hash="hash")
+        ).inserted_primary_key[0]
+        yield connection, user_id
+        transaction.rollback()
+        connection.close()
+
+    @pytest.fixture
+    def db_session(self, otp_connection):
+        """Per-test SAVEPOINT on the class transaction, so the shared user survives"""
+        connection, _ = otp_connection
+        savepoint = connection.begin_nested()
+        session = Session(bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint")
+        yield session
+        session.close()
+        savepoint.rollback()
+
+    @pytest.fixture
+    def otp_user(self, db_session, otp_connection):
+        return db_session.get(User, otp_connection[1])
+    
+    def test_otp_creation(self, db_session, otp_user):
         """Test creating an OTP with all fields"""
-        # First create a user
-        user = User(
-            first_name="John",
-            last_name="Doe",
-            email="john@example.com",
-            password_hash="hash"
-        )
-        db_session.add(user)
-        db_session.commit()
-        
+        user = otp_user
+
         # Create OTP
         expires_at = datetime.utcnow() + timedelta(minutes=10)
         last_sent_at = datetime.utcnow()
@@ -167,7 +186,6 @@ class TestOTP:
         )
         db_session.add(otp)
         db_session.commit()
-        db_session.refresh(otp)
         
         assert otp.id is not None
         assert otp.user_id == user.id
@@ -176,17 +194,10 @@ class TestOTP:
         assert otp.last_sent_at == last_sent_at
         assert otp.send_count == 2
     
-    def test_otp_default_send_count(self, db_session):
+    def test_otp_default_send_count(self, db_session, otp_user):
         """Test OTP creation with default send_count"""
-        user = User(
-            first_name="John",
-            last_name="Doe",
-            email="john@example.com",
-            password_hash="hash"
-        )
-        db_session.add(user)
-        db_session.commit()
-        
+        user = otp_user
+
         otp = OTP(
             user_id=user.id,
             code="654321",
@@ -195,21 +206,13 @@ class TestOTP:
         )
         db_session.add(otp)
         db_session.commit()
-        db_session.refresh(otp)
         
         assert otp.send_count == 1  # Default value
     
-    def test_otp_user_relationship(self, db_session):
+    def test_otp_user_relationship(self, db_session, otp_user):
         """Test the relationship between OTP and User"""
-        user = User(
-            first_name="John",
-            last_name="Doe",
-            email="john@example.com",
-            password_hash="hash"
-        )
-        db_session.add(user)
-        db_session.commit()
-        
+        user = otp_user
+
         otp = OTP(
             user_id=user.id,
             code="111111",
@@ -218,7 +221,6 @@ class TestOTP:
         )
         db_session.add(otp)
         db_session.commit()
-        db_session.refresh(otp)
         
         # Test relationship
         assert otp.user == user
@@ -237,7 +239,6 @@ class TestOTP:
         )
         db_session.add(otp)
         db_session.commit()
-        db_session.refresh(otp)
         
         # In SQLite, this will actually succeed, so we just verify the OTP was created
         assert otp.id is not None
@@ -256,51 +257,26 @@ class TestOTP:
         
         assert expected_min <= expiry_time <= expected_max
     
-    def test_otp_multiple_for_same_user(self, db_session):
+    def test_otp_multiple_for_same_user(self, db_session, otp_user):
         """Test creating multiple OTPs for the same user"""
-        user = User(
-            first_name="John",
-            last_name="Doe",
-            email="john@example.com",
-            password_hash="hash"
-        )
-        db_session.add(user)
-        db_session.commit()
-        
-        # Create multiple OTPs
-        otp1 = OTP(
-            user_id=user.id,
-            code="111111",
-            expires_at=datetime.utcnow() + timedelta(minutes=5),
-            last_sent_at=datetime.utcnow()
-        )
-        otp2 = OTP(
-            user_id=user.id,
-            code="222222",
-            expires_at=datetime.utcnow() + timedelta(minutes=5),
-            last_sent_at=datetime.utcnow()
-        )
-        
-        db_session.add(otp1)
-        db_session.add(otp2)
+        user = otp_user
+
+        # One executemany INSERT instead of two ORM flushes
+        expires_at = datetime.utcnow() + timedelta(minutes=5)
+        db_session.execute(insert(OTP), [
+            {"user_id": user.id, "code": "111111", "expires_at": expires_at, "last_sent_at": datetime.utcnow()},
+            {"user_id": user.id, "code": "222222", "expires_at": expires_at, "last_sent_at": datetime.utcnow()},
+        ])
         db_session.commit()
         
         # Both should be created successfully
-        assert otp1.id is not None
-        assert otp2.id is not None
-        assert otp1.user_id == otp2.user_id
+        codes = db_session.scalars(select(OTP.code).where(OTP.user_id == user.id).order_by(OTP.id)).all()
+        assert codes == ["111111", "222222"]
     
-    def test_otp_string_representation(self, db_session):
+    def test_otp_string_representation(self, db_session, otp_user):
         """Test OTP string representation"""
-        user = User(
-            first_name="John",
-            last_name="Doe",
-            email="john@example.com",
-            password_hash="hash"
-        )
-        db_session.add(user)
-        db_session.commit()
-        
+        user = otp_user
+
         otp = OTP(
             user_id=user.id,
             code="123456",
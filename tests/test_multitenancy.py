@@ -3,55 +3,150 @@ Tests for multitenancy features.
 """
 import pytest
 from fastapi import status
+from core import tenancy
 from models.store import Store
 from models.user import User, user_store_roles
+from services.otp import _FakePipeline
+
+
+class _FakeHashRedis:
+    """Just the hash commands the store host map uses."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hget(self, name, key):
+        return self.hashes.get(name, {}).get(key)
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        fields = dict(mapping or {})
+        if key is not None:
+            fields[key] = value
+        self.hashes.setdefault(name, {}).update({k: str(v) for k, v in fields.items()})
+
+    def hdel(self, name, *keys):
+        for key in keys:
+            self.hashes.get(name, {}).pop(key, None)
+
+    def delete(self, name):
+        self.hashes.pop(name, None)
+
+    def expire(self, name, seconds, nx=False):
+        return True
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+@pytest.fixture
+def host_map(monkeypatch):
+    fake = _FakeHashRedis()
+    monkeypatch.setattr(tenancy, "_redis", fake)
+    return fake.hashes.setdefault(tenancy.STORE_DOMAIN_MAP_KEY, {})
 
 
 class TestStoreResolution:
     """Test store resolution from domain/subdomain."""
     
-    def test_get_store_by_domain(self, client, test_store):
-        """Test store resolution by domain header."""
+    @pytest.mark.parametrize("state,expected,detail", [
+        ("active", status.HTTP_200_OK, None),
+        ("missing", status.HTTP_404_NOT_FOUND, "Store not found"),
+        ("inactive", status.HTTP_403_FORBIDDEN, "inactive"),
+        ("suspended", status.HTTP_403_FORBIDDEN, "suspended"),
+    ])
+    def test_store_resolution_by_domain(self, client, db_session_override, test_store, state, expected, detail):
+        """Test store resolution by domain header for each store state."""
+        domain = test_store.domain
+        if state == "missing":
+            domain = "nonexistent.example.com"
+        elif state == "inactive":
+            test_store.is_active = False
+        elif state == "suspended":
+            test_store.is_suspended = True
+            test_store.suspension_reason = "Payment overdue"
+        db_session_override.commit()
+
+        response = client.get("/products/", headers={"X-Store-Domain": domain})
+        assert response.status_code == expected
+        if detail:
+            assert detail in response.json()["detail"]
+
+    def test_expired_subscription_payment_required(self, client, db_session_override, test_store):
+        """Test accessing a store with a lapsed subscription returns 402."""
+        from datetime import datetime, timedelta
+
+        test_store.subscription_ends_at = datetime.utcnow() - timedelta(days=1)
+        db_session_override.commit()
+
         response = client.get(
             "/products/",
             headers={"X-Store-Domain": test_store.domain}
         )
-        # Should not return 404 for store not found
-        assert response.status_code != status.HTTP_404_NOT_FOUND
-    
-    def test_store_not_found(self, client):
-        """Test 404 when store domain doesn't exist."""
+        assert response.status_code == status.HTTP_402_PAYMENT_REQUIRED
+
+    def test_get_store_by_subdomain(self, client, test_store):
+        """Test store resolution falls back to subdomain match."""
         response = client.get(
-            "/products/",
-            headers={"X-Store-Domain": "nonexistent.example.com"}
+            "/stores/current",
+            headers={"X-Store-Domain": "test.platform.com"}
         )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == test_store.id
+
+    def test_store_domain_lookup_is_case_insensitive(self, client, db_session_override, test_store):
+        """Test a store saved with mixed-case domain resolves from a lowercased host."""
+        test_store.domain = "Test.Example.com"
+        db_session_override.commit()
+
+        response = client.get("/stores/current", headers={"X-Store-Domain": "test.example.com"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == test_store.id
+
+    def test_create_store_duplicate_domain(self, client, test_store):
+        """Test creating a store with an existing domain (any case) fails."""
+        response = client.post("/stores/", json={"name": "Copy", "domain": "TEST.example.com"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Domain already exists"
+
+    def test_store_lookup_is_cached(self, client, test_store):
+        """Test repeated requests for a domain reuse the cached store."""
+        client.get("/stores/current", headers={"X-Store-Domain": test_store.domain})
+        assert test_store.domain in tenancy._store_cache
+
+        tenancy.invalidate_store_cache(test_store.domain)
+        assert test_store.domain not in tenancy._store_cache
+
+    def test_new_store_domain_beats_cached_subdomain_match(self, client, db_session_override, test_store, host_map):
+        """Test a host first resolved by subdomain moves to the store that owns it as its domain."""
+        test_store.subdomain = "shop"
+        db_session_override.commit()
+        headers = {"X-Store-Domain": "shop.example.com"}
+
+        assert client.get("/stores/current", headers=headers).json()["id"] == test_store.id
+        assert host_map["shop.example.com"] == str(test_store.id)
+
+        created = client.post("/stores/", json={"name": "Shop", "domain": "shop.example.com"}).json()
+        assert host_map["shop.example.com"] == str(created["id"])
+        assert client.get("/stores/current", headers=headers).json()["id"] == created["id"]
+
+    def test_warm_map_holds_domains_only(self, db_session_override, test_store, host_map):
+        """Test warming maps exact domains and leaves subdomains to the SQL lookup."""
+        test_store.subdomain = "shop"
+        db_session_override.commit()
+
+        tenancy.warm_store_domain_map(db_session_override)
+
+        # Warming rebuilds the hash, so read the new one rather than host_map
+        assert tenancy._redis.hashes[tenancy.STORE_DOMAIN_MAP_KEY] == {test_store.domain: str(test_store.id)}
+
+    def test_stale_host_mapping_is_dropped(self, client, db_session_override, test_store, host_map):
+        """Test a host still mapped to a renamed store falls back to the SQL lookup."""
+        host_map["old.example.com"] = str(test_store.id)
+
+        response = client.get("/stores/current", headers={"X-Store-Domain": "old.example.com"})
+
         assert response.status_code == status.HTTP_404_NOT_FOUND
-        assert "Store not found" in response.json()["detail"]
-    
-    def test_inactive_store_forbidden(self, client, db, test_store):
-        """Test accessing inactive store returns 403."""
-        test_store.is_active = False
-        db.commit()
-        
-        response = client.get(
-            "/products/",
-            headers={"X-Store-Domain": test_store.domain}
-        )
-        assert response.status_code == status.HTTP_403_FORBIDDEN
-        assert "inactive" in response.json()["detail"]
-    
-    def test_suspended_store_forbidden(self, client, db, test_store):
-        """Test accessing suspended store returns 403."""
-        test_store.is_suspended = True
-        test_store.suspension_reason = "Payment overdue"
-        db.commit()
-        
-        response = client.get(
-            "/products/",
-            headers={"X-Store-Domain": test_store.domain}
-        )
-        assert response.status_code == status.HTTP_403_FORBIDDEN
-        assert "suspended" in response.json()["detail"]
+        assert "old.example.com" not in host_map
 
 
 class TestUserStoreRoles:
@@ -87,19 +182,13 @@ class TestUserStoreRoles:
             is_active=True,
         )
         db.add_all([store1, store2])
-        db.commit()
+        db.flush()  # assigns the store ids; one commit covers the whole setup
         
-        # Add user to both stores with different roles
-        db.execute(user_store_roles.insert().values(
-            user_id=test_user.id,
-            store_id=store1.id,
-            role="owner"
-        ))
-        db.execute(user_store_roles.insert().values(
-            user_id=test_user.id,
-            store_id=store2.id,
-            role="staff"
-        ))
+        # Add user to both stores with different roles in one executemany
+        db.execute(user_store_roles.insert(), [
+            {"user_id": test_user.id, "store_id": store1.id, "role": "owner"},
+            {"user_id": test_user.id, "store_id": store2.id, "role": "staff"},
+        ])
         db.commit()
         
         # Verify both roles exist
@@ -147,6 +236,23 @@ class TestStorePlans:
         assert store.max_orders_per_month == 10000
         assert store.max_storage_mb == 5000
 
+    def test_store_usage_stats(self, db_session_override, test_store):
+        """Test usage stats count products and this month's orders."""
+        from core.tenancy import get_store_usage_stats
+        from models.product import Product
+        from models.order import Order
+
+        db = db_session_override
+        db.add_all([
+            Product(store_id=test_store.id, name="P1", slug="p1", price=1000),
+            Product(store_id=test_store.id, name="P2", slug="p2", price=2000),
+            Order(store_id=test_store.id, email="buyer@example.com"),
+        ])
+        db.commit()
+
+        stats = get_store_usage_stats(test_store.id, db)
+        assert stats == {"product_count": 2, "orders_this_month": 1}
+
 
 class TestStoreSettings:
     """Test store configuration and settings."""
@@ -187,7 +293,6 @@ class TestStoreSettings:
         )
         db.add(store)
         db.commit()
-        db.refresh(store)
         
         assert store.settings == settings
         assert store.settings["enable_reviews"] is True
@@ -0,0 +1,86 @@
+"""
+Tests for store orders.
+"""
+import pytest
+from fastapi import status
+from models.product import Product
+
+
+@pytest.fixture
+def products(db_session_override, test_store):
+    """Create two products in the test store."""
+    items = [
+        Product(store_id=test_store.id, name="Shirt", slug="shirt", price=1000),
+        Product(store_id=test_store.id, name="Hat", slug="hat", price=250),
+    ]
+    db_session_override.add_all(items)
+    db_session_override.commit()
+    return items
+
+
+class TestOrders:
+    """Test order creation and retrieval."""
+
+    def test_create_order(self, client, test_store, products):
+        """Test creating an order totals its items."""
+        shirt, hat = products
+        response = client.post(
+            "/orders/",
+            headers={"X-Store-Domain": test_store.domain},
+            json={
+                "email": "buyer@example.com",
+                "items": [
+                    {"product_id": shirt.id, "quantity": 2},
+                    {"product_id": hat.id, "quantity": 1},
+                ],
+            },
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert data["subtotal"] == 22.5
+        assert data["total"] == 22.5
+        assert sorted((i["product_id"], i["quantity"], i["total"]) for i in data["items"]) == sorted(
+            [(shirt.id, 2, 20.0), (hat.id, 1, 2.5)]
+        )
+
+    def test_create_order_unknown_product(self, client, test_store):
+        """Test ordering a product from another store fails."""
+        response = client.post(
+            "/orders/",
+            headers={"X-Store-Domain": test_store.domain},
+            json={"email": "buyer@example.com", "items": [{"product_id": 999, "quantity": 1}]},
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_list_and_get_orders(self, client, test_store, products):
+        """Test listing and fetching orders includes their items."""
+        headers = {"X-Store-Domain": test_store.domain}
+        created = client.post(
+            "/orders/",
+            headers=headers,
+            json={"email": "buyer@example.com", "items": [{"product_id": products[0].id, "quantity": 1}]},
+        ).json()
+
+        listed = client.get("/orders/", headers=headers).json()
+        assert [o["id"] for o in listed] == [created["id"]]
+        assert len(listed[0]["items"]) == 1
+
+        fetched = client.get(f"/orders/{created['id']}", headers=headers)
+        assert fetched.status_code == status.HTTP_200_OK
+        assert fetched.json()["items"][0]["product_id"] == products[0].id
+
+    def test_get_order_from_other_store(self, client, db_session_override, test_store, products):
+        """Test an order is not visible through another store's domain."""
+        from models.store import Store
+
+        other = Store(name="Other Store", domain="other.example.com", is_active=True)
+        db_session_override.add(other)
+        db_session_override.commit()
+        created = client.post(
+            "/orders/",
+            headers={"X-Store-Domain": test_store.domain},
+            json={"email": "buyer@example.com", "items": [{"product_id": products[0].id, "quantity": 1}]},
+        ).json()
+
+        response = client.get(f"/orders/{created['id']}", headers={"X-Store-Domain": other.domain})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,69 @@
+"""
+Tests for Paystack payments.
+"""
+import pytest
+from fastapi import status
+from models.order import Order
+from models.payment import Payment
+from routes import payments as payments_routes
+
+
+@pytest.fixture
+def order(db_session_override, test_store):
+    """Create an unpaid order in the test store."""
+    order = Order(store_id=test_store.id, email="buyer@example.com", subtotal=2500, total=2500)
+    db_session_override.add(order)
+    db_session_override.commit()
+    return order
+
+
+class TestPayments:
+    """Test payment initialization and verification."""
+
+    def test_init_and_verify_payment(self, client, db_session_override, test_store, order, monkeypatch):
+        """Test only whitelisted provider fields are stored on the payment."""
+        init_calls = []
+        monkeypatch.setattr(payments_routes, "initialize_transaction", lambda **kwargs: init_calls.append(kwargs) or {
+            "status": True,
+            "message": "Authorization URL created",
+            "data": {"authorization_url": "https://pay.example/x", "access_code": "ac", "reference": "ref-1"},
+        })
+        monkeypatch.setattr(payments_routes, "verify_transaction", lambda reference: {
+            "status": True,
+            "message": "Verification successful",
+            "data": {
+                "reference": reference,
+                "status": "success",
+                "gateway_response": "Successful",
+                "channel": "card",
+                "fees": 38,
+                "authorization": {"bin": "408408", "signature": "SIG"},
+                "log": {"history": [{"type": "action"}] * 50},
+            },
+        })
+        headers = {"X-Store-Domain": test_store.domain}
+
+        response = client.post("/payments/init", headers=headers, json={"order_id": order.id})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["reference"] == "ref-1"
+        assert init_calls[0]["amount"] == 2500  # minor units go to Paystack as-is
+
+        response = client.post("/payments/verify", headers=headers, json={"reference": "ref-1"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "success"
+        assert response.json()["amount"] == 25.0
+
+        payment = db_session_override.query(Payment).filter_by(reference="ref-1").one()
+        assert payment.raw_response == {
+            "status": True,
+            "message": "Verification successful",
+            "data": {
+                "reference": "ref-1",
+                "status": "success",
+                "gateway_response": "Successful",
+                "channel": "card",
+                "fees": 38,
+            },
+        }
+        db_session_override.refresh(order)
+        assert order.status == "paid"
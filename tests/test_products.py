@@ -0,0 +1,54 @@
+"""
+Tests for store products.
+"""
+import pytest
+from fastapi import status
+from pydantic import ValidationError
+
+from models.product import Product
+from schemas.product import ProductCreate
+
+
+class TestProducts:
+    """Test product listing and retrieval."""
+
+    def test_list_products_omits_description(self, client, db_session_override, test_store):
+        """Test the listing returns summary fields only."""
+        db_session_override.add(
+            Product(store_id=test_store.id, name="Shirt", slug="shirt", price=1250, description="Long text")
+        )
+        db_session_override.commit()
+        headers = {"X-Store-Domain": test_store.domain}
+
+        response = client.get("/products/", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        [item] = response.json()
+        assert item["slug"] == "shirt"
+        assert item["price"] == 12.5
+        assert "description" not in item
+
+        response = client.get("/products/shirt", headers=headers)
+        assert response.json()["description"] == "Long text"
+
+    def test_delete_product(self, client, db_session_override, test_store):
+        """Test deleting a product, then deleting it again, returns 404."""
+        product = Product(store_id=test_store.id, name="Hat", slug="hat", price=500)
+        db_session_override.add(product)
+        db_session_override.commit()
+        headers = {"X-Store-Domain": test_store.domain}
+
+        response = client.delete(f"/products/{product.id}", headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        response = client.delete(f"/products/{product.id}", headers=headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.parametrize("price,expected", [("12.5", 1250), ("19.99", 1999), ("1.005", 101), ("2.675", 268)])
+    def test_price_parsed_as_decimal(self, price, expected):
+        """Test prices round half-up to minor units without float error."""
+        product = ProductCreate.model_validate_json(f'{{"name": "Hat", "slug": "hat", "price": {price}}}')
+        assert product.price == expected
+
+    def test_price_rejects_oversized_amount(self):
+        """Test amounts that would overflow the minor-unit column are rejected."""
+        with pytest.raises(ValidationError):
+            ProductCreate(name="Hat", slug="hat", price="1e30")
@@ -1,15 +1,27 @@
+import orjson
 import pytest
-from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from io import BytesIO
 
 from main import app
 from core.db import get_db
 from models.user import User
-from security.jwt import create_access_token
-from security.password import hash_password
+from tests.conftest import cached_access_token
 
-client = TestClient(app)
+# Smallest payloads that pass the route's magic-byte sniffing
+_TINY_PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+_TINY_JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 32
+_IMAGES = {"png": _TINY_PNG, "jpeg": _TINY_JPEG}
+
+
+def _json(response) -> dict:
+    return orjson.loads(response.content)
+
+
+def _image_upload(kind: str = "png", name: str = "me.png") -> dict:
+    return {"file": (name, BytesIO(_IMAGES[kind]), f"image/{kind}")}
 
 
 @pytest.fixture
@@ -19,40 +31,63 @@ def test_user(db: Session):
         first_name="Test",
         last_name="User",
         email="test@example.com",
-        password_hash=hash_password("testpassword"),
+        # Profile routes never verify passwords, so no KDF is needed
+        password_hash="not-a-real-hash",
         is_verified=True
     )
     db.add(user)
     db.commit()
-    db.refresh(user)
     return user
 
 
 @pytest.fixture
 def auth_headers(test_user: User):
     """Get auth headers for test user"""
-    access_token = create_access_token(str(test_user.id))
+    access_token = cached_access_token(str(test_user.id))
     return {"Authorization": f"Bearer {access_token}"}
 
 
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def aclient(db_session_override):
+    """Drive the async profile routes on the test's own event loop, no portal thread"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as c:
+        yield c
+
+
+@pytest.fixture
+def authed_client(aclient, auth_headers: dict):
+    """Async client with the test user's token set as a default header"""
+    aclient.headers.update(auth_headers)
+    return aclient
+
+
+@pytest.mark.anyio
 class TestProfileEndpoints:
     
-    def test_get_profile(self, test_user: User, auth_headers: dict):
+    async def test_get_profile(self, authed_client, test_user: User):
         """Test getting user profile"""
-        response = client.get("/profile/", headers=auth_headers)
+        response = await authed_client.get("/profile/")
         
         assert response.status_code == 200
-        data = response.json()
-        assert data["id"] == test_user.id
-        assert data["email"] == test_user.email
-        assert data["first_name"] == test_user.first_name
-        assert data["last_name"] == test_user.last_name
-        assert data["bio"] is None
-        assert data["address"] is None
-        assert data["age"] is None
-        assert data["profile_picture"] is None
+        data = _json(response)
+        expected = {
+            "id": test_user.id,
+            "email": test_user.email,
+            "first_name": test_user.first_name,
+            "last_name": test_user.last_name,
+            "bio": None,
+            "address": None,
+            "age": None,
+            "profile_picture": None,
+        }
+        assert data | expected == data
     
-    def test_update_profile(self, test_user: User, auth_headers: dict, db: Session):
+    async def test_update_profile(self, authed_client, test_user: User, db: Session):
         """Test updating user profile"""
         update_data = {
             "bio": "This is my bio",
@@ -60,98 +95,118 @@ class TestProfileEndpoints:
             "age": 25
         }
         
-        response = client.put("/profile/", json=update_data, headers=auth_headers)
+        response = await authed_client.put("/profile/", json=update_data)
         
         assert response.status_code == 200
-        data = response.json()
-        assert data["bio"] == update_data["bio"]
-        assert data["address"] == update_data["address"]
-        assert data["age"] == update_data["age"]
+        data = _json(response)
+        assert data | update_data == data
         
-        # Verify in database
-        db.refresh(test_user)
-        assert test_user.bio == update_data["bio"]
-        assert test_user.address == update_data["address"]
-        assert test_user.age == update_data["age"]
+        # Verify the committed row, not the shared session's identity map
+        row = db.execute(select(User.bio, User.address, User.age).where(User.id == test_user.id)).one()
+        assert tuple(row) == (update_data["bio"], update_data["address"], update_data["age"])
     
-    def test_patch_profile(self, test_user: User, auth_headers: dict, db: Session):
+    async def test_patch_profile(self, authed_client, test_user: User, db: Session):
         """Test partially updating user profile"""
         update_data = {
             "bio": "Updated bio"
         }
         
-        response = client.patch("/profile/", json=update_data, headers=auth_headers)
+        response = await authed_client.patch("/profile/", json=update_data)
         
         assert response.status_code == 200
-        data = response.json()
-        assert data["bio"] == update_data["bio"]
-        assert data["address"] is None  # Should remain unchanged
-        assert data["age"] is None  # Should remain unchanged
+        data = _json(response)
+        # address and age should remain unchanged
+        assert data | {**update_data, "address": None, "age": None} == data
     
-    def test_upload_profile_picture_invalid_file_type(self, auth_headers: dict):
+    async def test_upload_profile_picture_invalid_file_type(self, authed_client):
         """Test uploading non-image file"""
         # Create a text file instead of image
         file_data = b"This is not an image"
         files = {"file": ("test.txt", BytesIO(file_data), "text/plain")}
         
-        response = client.post("/profile/upload-picture", files=files, headers=auth_headers)
+        response = await authed_client.post("/profile/upload-picture", files=files)
+        
+        assert response.status_code == 400
+        assert "File must be an image" in _json(response)["detail"]
+    
+    async def test_upload_profile_picture_spoofed_content_type(self, authed_client):
+        """Test uploading non-image bytes labelled as an image"""
+        files = {"file": ("fake.jpg", BytesIO(b"This is not an image"), "image/jpeg")}
+        
+        response = await authed_client.post("/profile/upload-picture", files=files)
         
         assert response.status_code == 400
-        assert "File must be an image" in response.json()["detail"]
+        assert "File must be an image" in _json(response)["detail"]
     
-    def test_upload_profile_picture_large_file(self, auth_headers: dict):
+    async def test_upload_profile_picture_large_file(self, authed_client):
         """Test uploading file that's too large"""
-        # Create a large image file (6MB)
-        file_data = b"x" * (6 * 1024 * 1024)  # 6MB
-        files = {"file": ("large.jpg", BytesIO(file_data), "image/jpeg")}
+        # The declared size is enough to be rejected; no 6MB body is built
+        headers = {
+            "Content-Type": "multipart/form-data; boundary=x",
+            "Content-Length": str(6 * 1024 * 1024),
+        }
         
-        response = client.post("/profile/upload-picture", files=files, headers=auth_headers)
+        response = await authed_client.post("/profile/upload-picture", content=b"", headers=headers)
         
         assert response.status_code == 400
-        assert "File size must be less than 5MB" in response.json()["detail"]
+        assert "File size must be less than 5MB" in _json(response)["detail"]
     
-    def test_delete_profile_picture_no_picture(self, auth_headers: dict, test_user: User):
+    async def test_upload_profile_picture_streaming_cap(self, authed_client, monkeypatch):
+        """Test bodies that slip past the Content-Length check are cut off while streaming"""
+        from routes import profile as profile_routes
+
+        monkeypatch.setattr(profile_routes, "MAX_PICTURE_BYTES", 16)
+        response = await authed_client.post("/profile/upload-picture", files=_image_upload("jpeg", "big.jpg"))
+        
+        assert response.status_code == 400
+        assert "File size must be less than 5MB" in _json(response)["detail"]
+    
+    async def test_upload_profile_picture_success(self, authed_client, test_user: User, db: Session, monkeypatch):
+        """Test a valid image is uploaded in the request and its URL returned and saved"""
+        from routes import profile as profile_routes
+
+        uploads = []
+
+        def fake_upload(file_data, filename, user_id):
+            uploads.append((file_data.read(), filename, user_id))
+            return True, "https://cdn.example/me.png", None
+
+        monkeypatch.setattr(profile_routes.cloudinary_service, "upload_profile_picture", fake_upload)
+        response = await authed_client.post("/profile/upload-picture", files=_image_upload())
+        
+        assert response.status_code == 200
+        assert _json(response) == {
+            "success": True,
+            "url": "https://cdn.example/me.png",
+            "message": "Profile picture uploaded successfully",
+        }
+        assert uploads == [(_TINY_PNG, "me.png", test_user.id)]
+        saved = db.execute(select(User.profile_picture).where(User.id == test_user.id)).scalar_one()
+        assert saved == "https://cdn.example/me.png"
+    
+    async def test_delete_profile_picture_no_picture(self, authed_client, test_user: User):
         """Test deleting profile picture when none exists"""
-        response = client.delete("/profile/delete-picture", headers=auth_headers)
+        response = await authed_client.delete("/profile/delete-picture")
         
         assert response.status_code == 400
-        assert "No profile picture to delete" in response.json()["detail"]
+        assert "No profile picture to delete" in _json(response)["detail"]
     
-    def test_unauthorized_access(self):
+    @pytest.mark.parametrize("method,endpoint,kwargs", [
+        ("get", "/profile/", {}),
+        ("put", "/profile/", {"json": {}}),
+        ("patch", "/profile/", {"json": {}}),
+        ("post", "/profile/upload-picture", {"files": {"file": ("test.png", _TINY_PNG, "image/png")}}),
+        ("delete", "/profile/delete-picture", {}),
+    ])
+    async def test_unauthorized_access(self, aclient, method, endpoint, kwargs):
         """Test accessing profile endpoints without authentication"""
-        endpoints = [
-            ("GET", "/profile/"),
-            ("PUT", "/profile/", {}),
-            ("PATCH", "/profile/", {}),
-            ("POST", "/profile/upload-picture"),
-            ("DELETE", "/profile/delete-picture"),
-        ]
-        
-        for method, endpoint, *data in endpoints:
-            if method == "GET":
-                response = client.get(endpoint)
-            elif method == "PUT":
-                response = client.put(endpoint, json=data[0] if data else {})
-            elif method == "PATCH":
-                response = client.patch(endpoint, json=data[0] if data else {})
-            elif method == "POST":
-                response = client.post(endpoint, files={"file": ("test.jpg", BytesIO(b"test"), "image/jpeg")})
-            elif method == "DELETE":
-                response = client.delete(endpoint)
-            
-            assert response.status_code == 401
+        response = await getattr(aclient, method)(endpoint, **kwargs)
+        assert response.status_code == 401
     
-    def test_age_validation(self, test_user: User, auth_headers: dict):
+    @pytest.mark.parametrize("age,expected", [(-5, 422), (200, 422), (30, 200)])
+    async def test_age_validation(self, authed_client, test_user: User, age, expected):
         """Test age field validation"""
-        # Test negative age
-        response = client.put("/profile/", json={"age": -5}, headers=auth_headers)
-        assert response.status_code == 422
-        
-        # Test age too high
-        response = client.put("/profile/", json={"age": 200}, headers=auth_headers)
-        assert response.status_code == 422
-        
-        # Test valid age
-        response = client.put("/profile/", json={"age": 30}, headers=auth_headers)
-        assert response.status_code == 200
-        assert response.json()["age"] == 30
+        response = await authed_client.put("/profile/", json={"age": age})
+        assert response.status_code == expected
+        if expected == 200:
+            assert _json(response)["age"] == age
@@ -1,80 +1,89 @@
 import pytest
-import json
+import orjson
 import os
+import queue
+import re
+import smtplib
 from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime, timedelta
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-from core.db import Base
-from models.user import User
+from types import SimpleNamespace
+from services import email as email_service
 from services.email import send_email, render_template, send_templated_email, _send_email_direct
 from services.otp import (
     _generate_code, send_verification_code, verify_code, verify_code_without_email,
-    get_otp_status, _FakeRedis, redis_client, OTP_PREFIX, OTP_CODE_PREFIX,
+    get_otp_status, get_otp_status_many, _FakeRedis, OTP_PREFIX, OTP_CODE_PREFIX,
     OTP_LAST_SENT_PREFIX, OTP_EXPIRY
 )
 
+_RATE_LIMIT_RE = re.compile("Please wait")
 
-@pytest.fixture
-def db_session():
-    """Create a test database session"""
-    engine = create_engine("sqlite:///:memory:")
-    Base.metadata.create_all(bind=engine)
-    SessionLocal = sessionmaker(bind=engine)
-    session = SessionLocal()
-    yield session
-    session.close()
+# created_at is only echoed back, never compared to the clock
+_FROZEN_ISO = "2024-01-01T00:00:00"
 
 
-@pytest.fixture
-def test_user(db_session):
-    """Create a test user"""
-    user = User(
-        first_name="John",
-        last_name="Doe",
-        email="john.doe@example.com",
-        password_hash="hashed_password",
-        is_verified=False
-    )
-    db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
-    return user
+def _make_otp_data(user, code="123456", attempts=0):
+    """Payload shape send_verification_code stores under otp:<email>"""
+    return {
+        "code": code,
+        "user_id": user.id,
+        "email": user.email,
+        "created_at": _FROZEN_ISO,
+        "attempts": attempts,
+    }
 
 
 @pytest.fixture
+def fake_user():
+    """The OTP service only reads id, email and first_name; no database needed"""
+    return SimpleNamespace(id=1, email="john.doe@example.com", first_name="John")
+
+
+@pytest.fixture(scope="module")
 def fake_redis():
-    """Create a fake Redis instance for testing"""
+    """One fake Redis instance for the module, emptied after every test"""
     return _FakeRedis()
 
 
 @pytest.fixture(autouse=True)
-def clear_redis():
-    """Clear Redis before each test"""
-    # Clear all test keys
-    for key in list(redis_client._store.keys()) if hasattr(redis_client, '_store') else []:
-        redis_client.delete(key)
+def _reset_fake_redis(fake_redis):
+    yield
+    fake_redis._store.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_smtp_session(monkeypatch):
+    """Don't carry a (mocked) SMTP session from one test into the next"""
+    monkeypatch.setattr(email_service, "_smtp_pool", queue.LifoQueue(maxsize=email_service.SMTP_POOL_SIZE))
 
 
 class TestEmailService:
     """Test cases for email service"""
     
-    def test_render_template_success(self):
-        """Test successful template rendering"""
-        context = {"code": "123456", "first_name": "John"}
-        result = render_template("emails/verification_code.txt", context)
-        
-        assert "123456" in result
-        # Template only contains code, not first_name
-    
-    def test_render_template_with_missing_context(self):
-        """Test template rendering with missing context variables"""
-        context = {"code": "123456"}  # Missing first_name
+    @pytest.fixture(autouse=True)
+    def email_settings(self, monkeypatch):
+        mock = MagicMock()
+        monkeypatch.setattr("services.email.settings", mock)
+        return mock
+    
+    @pytest.fixture(autouse=True)
+    def mock_smtp(self, monkeypatch):
+        mock = MagicMock()
+        monkeypatch.setattr("smtplib.SMTP", mock)
+        return mock
+    
+    @pytest.fixture
+    def smtp_server(self, mock_smtp):
+        """The connection object _smtp_session gets back from smtplib.SMTP"""
+        return mock_smtp.return_value
+    
+    @pytest.mark.parametrize("context", [
+        {"code": "123456", "first_name": "John"},
+        {"code": "123456"},  # Missing first_name must not crash rendering
+    ])
+    def test_render_template_success(self, context):
+        """Test template rendering with full and partial context"""
         result = render_template("emails/verification_code.txt", context)
         
         assert "123456" in result
-        # Should not crash, template handles missing variables
     
     def test_render_template_not_found(self):
         """Test template rendering with non-existent template"""
@@ -93,11 +102,10 @@ class TestEmailService:
     
     @patch('services.email.USE_CELERY', True)
     @patch('services.email.send_email_task')
-    @patch('services.email.settings')
-    def test_send_email_with_celery_fallback(self, mock_settings, mock_task):
+    def test_send_email_with_celery_fallback(self, mock_task, email_settings):
         """Test falling back to direct email when Celery fails"""
         mock_task.delay.side_effect = Exception("Celery not available")
-        mock_settings.DEBUG = True
+        email_settings.DEBUG = True
         
         with patch('services.email._send_email_direct') as mock_direct:
             send_email("test@example.com", "Test Subject", "Test Body")
@@ -111,68 +119,96 @@ class TestEmailService:
         
         mock_direct.assert_called_once_with("test@example.com", "Test Subject", "Test Body")
     
-    @patch('services.email.settings')
-    @patch('smtplib.SMTP')
-    def test_send_email_direct_placeholder_credentials(self, mock_smtp, mock_settings):
+    def test_send_email_direct_placeholder_credentials(self, email_settings, mock_smtp, capsys):
         """Test direct email sending with placeholder credentials"""
-        mock_settings.SMTP_PASSWORD = "your-gmail-app-password"
-        
-        with patch('builtins.print') as mock_print:
-            _send_email_direct("test@example.com", "Test Subject", "Test Body")
-            
-            # Should print debug messages instead of sending
-            assert any("DEBUG: Email would be sent" in str(call) for call in mock_print.call_args_list)
-            mock_smtp.assert_not_called()
-    
-    @patch('services.email.settings')
-    @patch('smtplib.SMTP')
-    def test_send_email_direct_real_credentials(self, mock_smtp, mock_settings):
-        """Test direct email sending with real credentials"""
-        mock_settings.SMTP_PASSWORD = "real_password"
-        mock_settings.SMTP_HOST = "smtp.gmail.com"
-        mock_settings.SMTP_PORT = 587
-        mock_settings.SMTP_USERNAME = "test@gmail.com"
-        mock_settings.SMTP_FROM = None
+        email_settings.SMTP_PASSWORD = "your-gmail-app-password"
+        
+        _send_email_direct("test@example.com", "Test Subject", "Test Body")
         
-        # Mock SMTP server
-        mock_server = Mock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
+        # Should print debug messages instead of sending
+        assert "DEBUG: Email would be sent" in capsys.readouterr().out
+        mock_smtp.assert_not_called()
+    
+    def test_send_email_direct_real_credentials(self, email_settings, mock_smtp, smtp_server):
+        """Test direct email sending with real credentials"""
+        email_settings.SMTP_PASSWORD = "real_password"
+        email_settings.SMTP_HOST = "smtp.gmail.com"
+        email_settings.SMTP_PORT = 587
+        email_settings.SMTP_USERNAME = "test@gmail.com"
+        email_settings.SMTP_FROM = None
         
         _send_email_direct("test@example.com", "Test Subject", "Test Body")
+        _send_email_direct("other@example.com", "Test Subject", "Test Body")
         
-        # Should attempt to send email
+        # Should connect once and reuse the session for the second email
         mock_smtp.assert_called_once_with("smtp.gmail.com", 587)
-        mock_server.starttls.assert_called_once()
-        mock_server.login.assert_called_once_with("test@gmail.com", "real_password")
-        mock_server.send_message.assert_called_once()
-    
-    @patch('services.email.settings')
-    @patch('smtplib.SMTP')
-    def test_send_email_direct_failure_debug(self, mock_smtp, mock_settings):
-        """Test direct email sending failure in debug mode"""
-        mock_settings.SMTP_PASSWORD = "real_password"
-        mock_settings.DEBUG = True
-        mock_smtp.side_effect = Exception("SMTP connection failed")
+        smtp_server.starttls.assert_called_once()
+        smtp_server.login.assert_called_once_with("test@gmail.com", "real_password")
+        assert smtp_server.send_message.call_count == 2
+    
+    @pytest.mark.parametrize("error", [
+        smtplib.SMTPServerDisconnected(),
+        smtplib.SMTPResponseException(421, b"Idle timeout"),
+        smtplib.SMTPSenderRefused(451, b"Try again", "noreply@example.com"),
+        ConnectionResetError(),
+    ])
+    def test_send_email_direct_retries_stale_pooled_session(self, email_settings, mock_smtp, error):
+        """Test a pooled session that fails is dropped and the email resent on a fresh one"""
+        email_settings.SMTP_PASSWORD = "real_password"
+        stale, fresh = Mock(), Mock()
+        mock_smtp.side_effect = [stale, fresh]
+        _send_email_direct("first@example.com", "Test Subject", "Test Body")
+        stale.send_message.side_effect = error
+        
+        _send_email_direct("test@example.com", "Test Subject", "Test Body")
         
-        with patch('builtins.print') as mock_print:
-            _send_email_direct("test@example.com", "Test Subject", "Test Body")
-            
-            # Should print error message
-            assert any("Failed to send email" in str(call) for call in mock_print.call_args_list)
-    
-    @patch('services.email.settings')
-    @patch('smtplib.SMTP')
-    def test_send_email_direct_failure_production(self, mock_smtp, mock_settings):
-        """Test direct email sending failure in production"""
-        mock_settings.SMTP_PASSWORD = "real_password"
-        mock_settings.DEBUG = False
+        assert mock_smtp.call_count == 2
+        stale.close.assert_called_once()
+        fresh.send_message.assert_called_once()
+    
+    def test_send_email_direct_fresh_session_failure_not_retried(self, email_settings, mock_smtp, caplog):
+        """Test a brand-new session that fails is not retried, and the failure is logged"""
+        email_settings.SMTP_PASSWORD = "real_password"
+        email_settings.DEBUG = False
+        mock_smtp.return_value.send_message.side_effect = smtplib.SMTPResponseException(554, b"Rejected")
+        
+        _send_email_direct("test@example.com", "Test Subject", "Test Body")
+        
+        mock_smtp.assert_called_once()
+        assert "Email sending failed" in caplog.text
+    
+    def test_send_email_direct_concurrent_sends_use_separate_sessions(self, email_settings, mock_smtp):
+        """Test a send in flight doesn't hold up another; both sessions are pooled after"""
+        import threading
+        email_settings.SMTP_PASSWORD = "real_password"
+        first_started, release_first = threading.Event(), threading.Event()
+        slow, quick = Mock(), Mock()
+        slow.send_message.side_effect = lambda msg: (first_started.set(), release_first.wait(5))
+        mock_smtp.side_effect = [slow, quick]
+        
+        worker = threading.Thread(target=_send_email_direct, args=("a@example.com", "Subject", "Body"))
+        worker.start()
+        assert first_started.wait(5)
+        _send_email_direct("b@example.com", "Subject", "Body")
+        quick.send_message.assert_called_once()
+        release_first.set()
+        worker.join(5)
+        
+        assert email_service._smtp_pool.qsize() == 2
+    
+    @pytest.mark.parametrize("debug,expected", [
+        (True, "Failed to send email"),
+        (False, "Email sending failed"),
+    ])
+    def test_send_email_direct_failure(self, email_settings, mock_smtp, caplog, debug, expected):
+        """Test direct email sending failure in debug and production mode"""
+        email_settings.SMTP_PASSWORD = "real_password"
+        email_settings.DEBUG = debug
         mock_smtp.side_effect = Exception("SMTP connection failed")
         
-        with patch('builtins.print') as mock_print:
-            _send_email_direct("test@example.com", "Test Subject", "Test Body")
-            
-            # Should print generic error message
-            assert any("Email sending failed" in str(call) for call in mock_print.call_args_list)
+        _send_email_direct("test@example.com", "Test Subject", "Test Body")
+        
+        assert expected in caplog.text
     
     @patch('services.email.send_email')
     @patch('services.email.render_template')
@@ -189,6 +225,17 @@ class TestEmailService:
 class TestOTPService:
     """Test cases for OTP service"""
     
+    @pytest.fixture(autouse=True)
+    def _otp_redis(self, monkeypatch, fake_redis):
+        monkeypatch.setattr("services.otp.redis_client", fake_redis)
+        return fake_redis
+    
+    @pytest.fixture(autouse=True)
+    def otp_email(self, monkeypatch):
+        mock = MagicMock()
+        monkeypatch.setattr("services.otp.send_templated_email", mock)
+        return mock
+    
     def test_generate_code(self):
         """Test OTP code generation"""
         code = _generate_code()
@@ -197,266 +244,217 @@ class TestOTPService:
         assert len(code) == 6
         assert code.isdigit()
         
-        # Test multiple generations
-        codes = [_generate_code() for _ in range(100)]
-        assert len(set(codes)) > 50  # Should be mostly unique
+        # Should be mostly unique; stop as soon as that is shown
+        seen = set()
+        for _ in range(100):
+            seen.add(_generate_code())
+            if len(seen) > 50:
+                break
+        else:
+            pytest.fail(f"only {len(seen)} unique codes in 100 draws")
     
     @patch('services.otp.settings')
-    def test_send_verification_code_success(self, mock_settings, test_user, fake_redis):
+    def test_send_verification_code_success(self, mock_settings, fake_user, fake_redis, otp_email):
         """Test successful OTP generation and sending"""
         mock_settings.OTP_RESEND_INTERVAL_SECONDS = 60
         mock_settings.OTP_TTL_SECONDS = 600
         
-        with patch('services.otp.redis_client', fake_redis):
-            with patch('services.otp.send_templated_email') as mock_email:
-                code = send_verification_code(None, test_user)  # Pass None for db_session
-                
-                assert isinstance(code, str)
-                assert len(code) == 6
-                assert code.isdigit()
-                
-                # Check Redis storage
-                otp_key = f"{OTP_PREFIX}{test_user.email}"
-                otp_data_str = fake_redis.get(otp_key)
-                assert otp_data_str is not None
-                
-                otp_data = json.loads(otp_data_str)
-                assert otp_data["code"] == code
-                assert otp_data["user_id"] == test_user.id
-                assert otp_data["email"] == test_user.email
-                assert otp_data["attempts"] == 0
-                
-                # Check code mapping
-                code_key = f"{OTP_CODE_PREFIX}{code}"
-                assert fake_redis.get(code_key) == test_user.email
-                
-                # Check rate limiter
-                last_key = f"{OTP_LAST_SENT_PREFIX}{test_user.email}"
-                assert fake_redis.exists(last_key) == 1
-                
-                # Check email was sent
-                mock_email.assert_called_once()
+        code = send_verification_code(None, fake_user)  # Pass None for db_session
+        
+        assert isinstance(code, str)
+        assert len(code) == 6
+        assert code.isdigit()
+        
+        # Check Redis storage
+        otp_key = f"{OTP_PREFIX}{fake_user.email}"
+        otp_data_str = fake_redis.get(otp_key)
+        assert otp_data_str is not None
+        
+        otp_data = orjson.loads(otp_data_str)
+        assert otp_data["code"] == code
+        assert otp_data["user_id"] == fake_user.id
+        assert otp_data["email"] == fake_user.email
+        assert otp_data["attempts"] == 0
+        
+        # Check code mapping
+        code_key = f"{OTP_CODE_PREFIX}{code}"
+        assert fake_redis.get(code_key) == fake_user.email
+        
+        # Check rate limiter
+        last_key = f"{OTP_LAST_SENT_PREFIX}{fake_user.email}"
+        assert fake_redis.exists(last_key) == 1
+        
+        # Check email was sent
+        otp_email.assert_called_once()
     
     @patch('services.otp.settings')
-    def test_send_verification_code_rate_limit(self, mock_settings, test_user, fake_redis):
+    def test_send_verification_code_rate_limit(self, mock_settings, fake_user, fake_redis):
         """Test OTP rate limiting"""
         mock_settings.OTP_RESEND_INTERVAL_SECONDS = 60
         mock_settings.OTP_TTL_SECONDS = 600
         
-        with patch('services.otp.redis_client', fake_redis):
-            with patch('services.otp.send_templated_email'):
-                # Send first OTP
-                send_verification_code(None, test_user)
-                
-                # Try to send second OTP immediately
-                with pytest.raises(ValueError, match="Please wait"):
-                    send_verification_code(None, test_user)
+        # Send first OTP
+        send_verification_code(None, fake_user)
+        
+        # Try to send second OTP immediately
+        with pytest.raises(ValueError, match=_RATE_LIMIT_RE):
+            send_verification_code(None, fake_user)
+    
+    @patch('services.otp.settings')
+    def test_send_verification_code_rate_limit_clamps_ttl(self, mock_settings, fake_user, fake_redis, monkeypatch):
+        """Test a slot expiring between SET and TTL still reports a positive wait"""
+        mock_settings.OTP_RESEND_INTERVAL_SECONDS = 60
+        fake_redis.set(f"{OTP_LAST_SENT_PREFIX}{fake_user.email}", "1", ex=60)
+        monkeypatch.setattr(fake_redis, "ttl", lambda key: -2)
+        
+        with pytest.raises(ValueError, match="Please wait 1 seconds"):
+            send_verification_code(None, fake_user)
+    
+    @patch('services.otp.settings')
+    def test_send_verification_code_failure_releases_slot(self, mock_settings, fake_user, fake_redis, otp_email):
+        """Test a failed send doesn't lock the user out for the resend interval"""
+        mock_settings.OTP_RESEND_INTERVAL_SECONDS = 60
+        otp_email.side_effect = RuntimeError("broker down")
+        
+        with pytest.raises(RuntimeError):
+            send_verification_code(None, fake_user)
+        
+        assert fake_redis.exists(f"{OTP_LAST_SENT_PREFIX}{fake_user.email}") == 0
+        otp_email.side_effect = None
+        assert send_verification_code(None, fake_user)
     
     @patch('services.otp.settings')
-    def test_send_verification_code_no_rate_limit(self, mock_settings, test_user, fake_redis):
+    def test_send_verification_code_no_rate_limit(self, mock_settings, fake_user, fake_redis, otp_email):
         """Test OTP sending without rate limiting"""
         mock_settings.OTP_RESEND_INTERVAL_SECONDS = 0  # Disabled
         mock_settings.OTP_TTL_SECONDS = 600
         
-        with patch('services.otp.redis_client', fake_redis):
-            with patch('services.otp.send_templated_email') as mock_email:
-                # Send multiple OTPs
-                code1 = send_verification_code(None, test_user)
-                code2 = send_verification_code(None, test_user)
-                
-                # Should succeed both times
-                assert code1 != code2  # Different codes
-                assert mock_email.call_count == 2
-    
-    def test_verify_code_success(self, test_user, fake_redis):
-        """Test successful OTP verification"""
-        # Store OTP in Redis
-        code = "123456"
-        otp_data = {
-            "code": code,
-            "user_id": test_user.id,
-            "email": test_user.email,
-            "created_at": datetime.utcnow().isoformat(),
-            "attempts": 0
-        }
-        
-        with patch('services.otp.redis_client', fake_redis):
-            otp_key = f"{OTP_PREFIX}{test_user.email}"
-            fake_redis.setex(otp_key, OTP_EXPIRY, json.dumps(otp_data))
-            
-            result = verify_code(None, test_user, code)
-            
-            assert result is True
-            # OTP should be deleted after successful verification
-            assert fake_redis.get(otp_key) is None
-    
-    def test_verify_code_invalid(self, test_user, fake_redis):
-        """Test OTP verification with invalid code"""
-        # Store OTP in Redis
-        code = "123456"
-        otp_data = {
-            "code": code,
-            "user_id": test_user.id,
-            "email": test_user.email,
-            "created_at": datetime.utcnow().isoformat(),
-            "attempts": 0
+        # Send multiple OTPs
+        code1 = send_verification_code(None, fake_user)
+        code2 = send_verification_code(None, fake_user)
+        
+        # Should succeed both times
+        assert code1 != code2  # Different codes
+        assert otp_email.call_count == 2
+    
+    @pytest.mark.parametrize("stored,submitted,expected,remaining_attempts", [
+        ("fresh", "123456", True, None),         # success consumes the OTP
+        ("fresh", "654321", False, 1),           # wrong code counts an attempt
+        (None, "123456", False, None),           # nothing stored
+        ("maxed", "123456", False, None),        # too many attempts deletes it
+        ("corrupted", "123456", False, None),    # unreadable payload deletes it
+    ])
+    def test_verify_code(self, fake_user, fake_redis, stored, submitted, expected, remaining_attempts):
+        """Test OTP verification outcomes and what is left in Redis"""
+        payloads = {
+            "fresh": orjson.dumps(_make_otp_data(fake_user)),
+            "maxed": orjson.dumps(_make_otp_data(fake_user, attempts=5)),
+            "corrupted": "corrupted_json_data",
         }
+        otp_key = f"{OTP_PREFIX}{fake_user.email}"
+        if stored is not None:
+            fake_redis.setex(otp_key, OTP_EXPIRY, payloads[stored])
         
-        with patch('services.otp.redis_client', fake_redis):
-            otp_key = f"{OTP_PREFIX}{test_user.email}"
-            fake_redis.setex(otp_key, OTP_EXPIRY, json.dumps(otp_data))
-            
-            result = verify_code(None, test_user, "654321")
-            
-            assert result is False
-            # OTP should still exist with incremented attempts
-            updated_data_str = fake_redis.get(otp_key)
-            updated_data = json.loads(updated_data_str)
-            assert updated_data["attempts"] == 1
-    
-    def test_verify_code_not_found(self, test_user, fake_redis):
-        """Test OTP verification when OTP doesn't exist"""
-        with patch('services.otp.redis_client', fake_redis):
-            result = verify_code(None, test_user, "123456")
-            
-            assert result is False
-    
-    def test_verify_code_max_attempts(self, test_user, fake_redis):
-        """Test OTP verification when max attempts exceeded"""
-        # Store OTP with max attempts
-        code = "123456"
-        otp_data = {
-            "code": code,
-            "user_id": test_user.id,
-            "email": test_user.email,
-            "created_at": datetime.utcnow().isoformat(),
-            "attempts": 5  # Max attempts reached
-        }
+        assert verify_code(None, fake_user, submitted) is expected
         
-        with patch('services.otp.redis_client', fake_redis):
-            otp_key = f"{OTP_PREFIX}{test_user.email}"
-            fake_redis.setex(otp_key, OTP_EXPIRY, json.dumps(otp_data))
-            
-            result = verify_code(None, test_user, code)
-            
-            assert result is False
-            # OTP should be deleted
-            assert fake_redis.get(otp_key) is None
-    
-    def test_verify_code_corrupted_data(self, test_user, fake_redis):
-        """Test OTP verification with corrupted data"""
-        with patch('services.otp.redis_client', fake_redis):
-            otp_key = f"{OTP_PREFIX}{test_user.email}"
-            fake_redis.setex(otp_key, OTP_EXPIRY, "corrupted_json_data")
-            
-            result = verify_code(None, test_user, "123456")
-            
-            assert result is False
-            # Corrupted data should be deleted
-            assert fake_redis.get(otp_key) is None
-    
-    def test_verify_code_without_email_success(self, test_user, fake_redis):
+        left = fake_redis.get(otp_key)
+        if remaining_attempts is None:
+            assert left is None
+        else:
+            assert orjson.loads(left)["attempts"] == remaining_attempts
+    
+    def test_verify_code_without_email_success(self, fake_user, fake_redis):
         """Test OTP verification without email success"""
         code = "123456"
-        otp_data = {
-            "code": code,
-            "user_id": test_user.id,
-            "email": test_user.email,
-            "created_at": datetime.utcnow().isoformat(),
-            "attempts": 0
-        }
+        otp_data = _make_otp_data(fake_user, code)
         
-        with patch('services.otp.redis_client', fake_redis):
-            # Store OTP and code mapping
-            otp_key = f"{OTP_PREFIX}{test_user.email}"
-            code_key = f"{OTP_CODE_PREFIX}{code}"
-            
-            fake_redis.setex(otp_key, OTP_EXPIRY, json.dumps(otp_data))
-            fake_redis.setex(code_key, OTP_EXPIRY, test_user.email)
-            
-            result, email = verify_code_without_email(code)
-            
-            assert result is True
-            assert email == test_user.email
-            # Both keys should be deleted
-            assert fake_redis.get(otp_key) is None
-            assert fake_redis.get(code_key) is None
-    
-    def test_verify_code_without_email_invalid(self, test_user, fake_redis):
+        # Store OTP and code mapping
+        otp_key = f"{OTP_PREFIX}{fake_user.email}"
+        code_key = f"{OTP_CODE_PREFIX}{code}"
+        
+        fake_redis.setex(otp_key, OTP_EXPIRY, orjson.dumps(otp_data))
+        fake_redis.setex(code_key, OTP_EXPIRY, fake_user.email)
+        
+        result, email = verify_code_without_email(code)
+        
+        assert result is True
+        assert email == fake_user.email
+        # Both keys should be deleted
+        assert fake_redis.get(otp_key) is None
+        assert fake_redis.get(code_key) is None
+    
+    def test_verify_code_without_email_invalid(self, fake_user, fake_redis):
         """Test OTP verification without email with invalid code"""
-        with patch('services.otp.redis_client', fake_redis):
-            result, email = verify_code_without_email("654321")
-            
-            assert result is False
-            assert email is None
+        result, email = verify_code_without_email("654321")
+        
+        assert result is False
+        assert email is None
     
-    def test_verify_code_without_email_max_attempts(self, test_user, fake_redis):
+    def test_verify_code_without_email_max_attempts(self, fake_user, fake_redis):
         """Test OTP verification without email when max attempts exceeded"""
         code = "123456"
-        otp_data = {
-            "code": code,
-            "user_id": test_user.id,
-            "email": test_user.email,
-            "created_at": datetime.utcnow().isoformat(),
-            "attempts": 5  # Max attempts reached
-        }
+        otp_data = _make_otp_data(fake_user, code, attempts=5)
+        
+        # Store OTP and code mapping
+        otp_key = f"{OTP_PREFIX}{fake_user.email}"
+        code_key = f"{OTP_CODE_PREFIX}{code}"
+        
+        fake_redis.setex(otp_key, OTP_EXPIRY, orjson.dumps(otp_data))
+        fake_redis.setex(code_key, OTP_EXPIRY, fake_user.email)
         
-        with patch('services.otp.redis_client', fake_redis):
-            # Store OTP and code mapping
-            otp_key = f"{OTP_PREFIX}{test_user.email}"
-            code_key = f"{OTP_CODE_PREFIX}{code}"
-            
-            fake_redis.setex(otp_key, OTP_EXPIRY, json.dumps(otp_data))
-            fake_redis.setex(code_key, OTP_EXPIRY, test_user.email)
-            
-            result, email = verify_code_without_email(code)
-            
-            assert result is False
-            assert email is None
-            # Both keys should be deleted
-            assert fake_redis.get(otp_key) is None
-            assert fake_redis.get(code_key) is None
-    
-    def test_get_otp_status_exists(self, test_user, fake_redis):
+        result, email = verify_code_without_email(code)
+        
+        assert result is False
+        assert email is None
+        # Both keys should be deleted
+        assert fake_redis.get(otp_key) is None
+        assert fake_redis.get(code_key) is None
+    
+    def test_get_otp_status_exists(self, fake_user, fake_redis):
         """Test getting OTP status when OTP exists"""
-        otp_data = {
-            "code": "123456",
-            "user_id": test_user.id,
-            "email": test_user.email,
-            "created_at": datetime.utcnow().isoformat(),
-            "attempts": 2
-        }
+        otp_data = _make_otp_data(fake_user, attempts=2)
+        
+        otp_key = f"{OTP_PREFIX}{fake_user.email}"
+        fake_redis.setex(otp_key, OTP_EXPIRY, orjson.dumps(otp_data))
+        
+        status = get_otp_status(fake_user.email)
+        
+        assert status["exists"] is True
+        assert status["email"] == fake_user.email
+        assert status["created_at"] == otp_data["created_at"]
+        assert status["attempts"] == 2
+        assert "ttl_seconds" in status
+    
+    def test_get_otp_status_many(self, fake_user, fake_redis):
+        """Test bulk OTP status keeps input order and reports missing entries"""
+        otp_data = _make_otp_data(fake_user, attempts=1)
         
-        with patch('services.otp.redis_client', fake_redis):
-            otp_key = f"{OTP_PREFIX}{test_user.email}"
-            fake_redis.setex(otp_key, OTP_EXPIRY, json.dumps(otp_data))
-            
-            status = get_otp_status(test_user.email)
-            
-            assert status["exists"] is True
-            assert status["email"] == test_user.email
-            assert status["created_at"] == otp_data["created_at"]
-            assert status["attempts"] == 2
-            assert "ttl_seconds" in status
+        fake_redis.setex(f"{OTP_PREFIX}{fake_user.email}", OTP_EXPIRY, orjson.dumps(otp_data))
+        
+        missing, found = get_otp_status_many(["nobody@example.com", fake_user.email])
+        
+        assert missing == {"exists": False}
+        assert found["exists"] is True
+        assert found["attempts"] == 1
+        assert 0 < found["ttl_seconds"] <= OTP_EXPIRY
+        assert get_otp_status_many([]) == []
     
     def test_get_otp_status_not_exists(self, fake_redis):
         """Test getting OTP status when OTP doesn't exist"""
-        with patch('services.otp.redis_client', fake_redis):
-            status = get_otp_status("nonexistent@example.com")
-            
-            assert status["exists"] is False
+        status = get_otp_status("nonexistent@example.com")
+        
+        assert status["exists"] is False
     
-    def test_get_otp_status_corrupted_data(self, test_user, fake_redis):
+    def test_get_otp_status_corrupted_data(self, fake_user, fake_redis):
         """Test getting OTP status with corrupted data"""
-        with patch('services.otp.redis_client', fake_redis):
-            otp_key = f"{OTP_PREFIX}{test_user.email}"
-            fake_redis.setex(otp_key, OTP_EXPIRY, "corrupted_json")
-            
-            status = get_otp_status(test_user.email)
-            
-            assert status["exists"] is False
-            # Corrupted data should be deleted
-            assert fake_redis.get(otp_key) is None
+        otp_key = f"{OTP_PREFIX}{fake_user.email}"
+        fake_redis.setex(otp_key, OTP_EXPIRY, "corrupted_json")
+        
+        status = get_otp_status(fake_user.email)
+        
+        assert status["exists"] is False
+        # Corrupted data should be deleted
+        assert fake_redis.get(otp_key) is None
 
 
 class TestFakeRedis:
@@ -472,14 +470,15 @@ class TestFakeRedis:
     def test_fake_redis_expiry(self):
         """Test FakeRedis key expiration"""
         redis = _FakeRedis()
+        now = [1000.0]
+        redis._now = lambda: now[0]
         
         # Set key with 1 second TTL
         redis.setex("test_key", 1, "test_value")
         assert redis.get("test_key") == "test_value"
         
-        # Wait for expiration
-        import time
-        time.sleep(1.1)
+        # Advance the fake clock past the TTL
+        now[0] += 1.1
         
         assert redis.get("test_key") is None
     
@@ -492,6 +491,15 @@ class TestFakeRedis:
         redis.setex("test_key", 60, "test_value")
         assert redis.exists("test_key") == 1
     
+    def test_fake_redis_set_nx(self):
+        """Test FakeRedis SET NX only writes absent keys"""
+        redis = _FakeRedis()
+        
+        assert redis.set("test_key", "first", ex=60, nx=True) is True
+        assert redis.set("test_key", "second", ex=60, nx=True) is None
+        assert redis.get("test_key") == "first"
+        assert 0 < redis.ttl("test_key") <= 60
+    
     def test_fake_redis_ttl(self):
         """Test FakeRedis TTL operation"""
         redis = _FakeRedis()
@@ -528,7 +536,8 @@ class TestFakeRedis:
         assert redis.get("test_key") == "test_value"
         
         # Manually expire by setting past expiry
-        redis._exp["test_key"] = datetime.utcnow().timestamp() - 1
+        import time
+        redis._store["test_key"] = ("test_value", time.monotonic() - 1)
         
         # Any operation should clean up the expired key
         assert redis.exists("test_key") == 0